@@ -7,10 +7,13 @@ This module provides functionality to process multiple Schwab CSV files
 and merge their output into a single file with source file metadata.
 """
 
+import os
 from typing import List, Dict, Any, Optional, Callable, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
 
 
@@ -42,6 +45,9 @@ class BatchOptions:
     filter_triggered_rejected: bool = True
     """Filter out rows with TRIGGERED or REJECTED status."""
 
+    max_workers: int = 1
+    """Number of worker processes used to parse files (1 = sequential)."""
+
 
 @dataclass
 class FileProgress:
@@ -70,6 +76,23 @@ class FileProgress:
 ProgressCallback = Callable[[FileProgress], None]
 
 
+def source_name(source: Any, file_index: int) -> str:
+    """
+    Get the display name of a batch input.
+
+    Args:
+        source: Path to a CSV file, or an open text/binary stream
+        file_index: Index of the source in the batch
+
+    Returns:
+        The path itself, the stream's name, or '<stream N>' for unnamed streams
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    name = getattr(source, 'name', None)
+    return name if isinstance(name, str) else f'<stream {file_index}>'
+
+
 def get_sort_time(record: Dict[str, Any]) -> Optional[datetime]:
     """
     Extract the appropriate time field for sorting.
@@ -184,7 +207,7 @@ class BatchResult:
 
 
 def process_multiple_files(
-    file_paths: List[str],
+    file_paths: List[Any],
     output_path: str,
     options: BatchOptions,
     progress_callback: Optional[ProgressCallback] = None
@@ -192,12 +215,21 @@ def process_multiple_files(
     """
     Process multiple CSV files and merge output into a single file.
 
-    This function processes multiple Schwab CSV files sequentially and writes
-    all records to a single output file in NDJSON or JSON array format. Each
-    record includes a 'source_file' field identifying which file it came from.
+    This function processes multiple Schwab CSV files and writes all records
+    to a single output file in NDJSON or JSON array format. Each record
+    includes a 'source_file' field identifying which file it came from.
+
+    Files are parsed sequentially unless options.max_workers is greater than
+    1, in which case they are parsed in a process pool. Results are always
+    consumed in input order, so output and progress callbacks are identical
+    in both modes.
+
+    Inputs may also be open text or binary streams (e.g. io.StringIO); they
+    are reported by their name attribute, or as '<stream N>' if unnamed.
+    Streams must be picklable to be parsed in a process pool.
 
     Args:
-        file_paths: List of paths to CSV files to process
+        file_paths: List of paths to CSV files (or open streams) to process
         output_path: Path to output file (.ndjson or .json)
         options: Batch processing options
         progress_callback: Optional callback for progress updates
@@ -223,8 +255,7 @@ def process_multiple_files(
         - source_file: str - basename of the source CSV file
         - source_file_index: int - index of the file in the batch
     """
-    import json
-    from main import validate
+    from main import validate, write_ndjson
 
     if not file_paths:
         raise ValueError("file_paths cannot be empty")
@@ -238,77 +269,94 @@ def process_multiple_files(
     file_errors: Dict[str, str] = {}
     all_records: List[Dict[str, Any]] = []
 
-    # Process each file sequentially
-    for file_index, file_path in enumerate(file_paths):
-        try:
-            # Notify progress: processing
-            if progress_callback:
-                progress = FileProgress(
-                    file_path=file_path,
-                    file_index=file_index,
-                    total_files=total_files,
-                    records_parsed=0,
-                    status='processing'
-                )
-                progress_callback(progress)
-
-            # Process the file
-            records, sections_skipped = process_single_file_for_batch(file_path, file_index, options)
-            total_sections_skipped += sections_skipped
-
-            # Validate and aggregate issues
-            validation_issues = validate(records)
-            for issue_type, count in validation_issues.items():
-                aggregated_validation_issues[issue_type] = \
-                    aggregated_validation_issues.get(issue_type, 0) + count
-
-            # Add to results
-            all_records.extend(records)
-            total_records += len(records)
-            successful_files += 1
-
-            # Notify progress: completed
-            if progress_callback:
-                progress = FileProgress(
-                    file_path=file_path,
-                    file_index=file_index,
-                    total_files=total_files,
-                    records_parsed=len(records),
-                    status='completed'
-                )
-                progress_callback(progress)
-
-        except FileNotFoundError as e:
-            failed_files += 1
-            file_errors[file_path] = f"File not found: {str(e)}"
-
-            # Notify progress: failed
-            if progress_callback:
-                progress = FileProgress(
-                    file_path=file_path,
-                    file_index=file_index,
-                    total_files=total_files,
-                    records_parsed=0,
-                    status='failed',
-                    error=file_errors[file_path]
-                )
-                progress_callback(progress)
-
-        except Exception as e:
-            failed_files += 1
-            file_errors[file_path] = str(e)
-
-            # Notify progress: failed
-            if progress_callback:
-                progress = FileProgress(
-                    file_path=file_path,
-                    file_index=file_index,
-                    total_files=total_files,
-                    records_parsed=0,
-                    status='failed',
-                    error=file_errors[file_path]
-                )
-                progress_callback(progress)
+    with ExitStack() as stack:
+        # Parse files in worker processes when parallelism is requested
+        futures = None
+        if options.max_workers > 1 and total_files > 1:
+            executor = stack.enter_context(
+                ProcessPoolExecutor(max_workers=min(options.max_workers, total_files))
+            )
+            futures = [
+                executor.submit(process_single_file_for_batch, path, index, options)
+                for index, path in enumerate(file_paths)
+            ]
+
+        # Process each file in input order
+        for file_index, source in enumerate(file_paths):
+            file_path = source_name(source, file_index)
+            try:
+                # Notify progress: processing
+                if progress_callback:
+                    progress = FileProgress(
+                        file_path=file_path,
+                        file_index=file_index,
+                        total_files=total_files,
+                        records_parsed=0,
+                        status='processing'
+                    )
+                    progress_callback(progress)
+
+                # Process the file (or collect its result from the pool)
+                if futures is not None:
+                    records, sections_skipped = futures[file_index].result()
+                else:
+                    records, sections_skipped = process_single_file_for_batch(source, file_index, options)
+                total_sections_skipped += sections_skipped
+
+                # Validate and aggregate issues (skipped for files with no records)
+                if records:
+                    validation_issues = validate(records)
+                    for issue_type, count in validation_issues.items():
+                        aggregated_validation_issues[issue_type] = \
+                            aggregated_validation_issues.get(issue_type, 0) + count
+
+                # Add to results
+                all_records.extend(records)
+                total_records += len(records)
+                successful_files += 1
+
+                # Notify progress: completed
+                if progress_callback:
+                    progress = FileProgress(
+                        file_path=file_path,
+                        file_index=file_index,
+                        total_files=total_files,
+                        records_parsed=len(records),
+                        status='completed'
+                    )
+                    progress_callback(progress)
+
+            except FileNotFoundError as e:
+                failed_files += 1
+                file_errors[file_path] = f"File not found: {str(e)}"
+
+                # Notify progress: failed
+                if progress_callback:
+                    progress = FileProgress(
+                        file_path=file_path,
+                        file_index=file_index,
+                        total_files=total_files,
+                        records_parsed=0,
+                        status='failed',
+                        error=file_errors[file_path]
+                    )
+                    progress_callback(progress)
+
+            except Exception as e:
+                failed_files += 1
+                file_errors[file_path] = str(e)
+
+                # Notify progress: failed
+                if progress_callback:
+                    progress = FileProgress(
+                        file_path=file_path,
+                        file_index=file_index,
+                        total_files=total_files,
+                        records_parsed=0,
+                        status='failed',
+                        error=file_errors[file_path]
+                    )
+                    progress_callback(progress)
 
     # Group and sort records if requested
     if options.group_by_section and all_records:
@@ -316,9 +364,7 @@ def process_multiple_files(
 
     # Write output file
     if all_records:
-        with open(output_path, 'w', encoding='utf-8') as out:
-            for record in all_records:
-                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        write_ndjson(all_records, output_path)
 
     return BatchResult(
         total_files=total_files,
@@ -332,7 +378,7 @@ def process_multiple_files(
 
 
 def process_single_file_for_batch(
-    file_path: str,
+    file_path: Any,
     file_index: int,
     options: BatchOptions
 ) -> Tuple[List[Dict[str, Any]], int]:
@@ -343,7 +389,7 @@ def process_single_file_for_batch(
     source file metadata to each record.
 
     Args:
-        file_path: Path to CSV file
+        file_path: Path to CSV file, or an open text/binary stream
         file_index: Index of this file in the batch
         options: Batch processing options
 
@@ -365,7 +411,7 @@ def process_single_file_for_batch(
     )
 
     # Add source file metadata to each record
-    source_filename = Path(file_path).name
+    source_filename = Path(source_name(file_path, file_index)).name
     for record in records:
         record['source_file'] = source_filename
         record['source_file_index'] = file_index
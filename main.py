@@ -4,19 +4,27 @@
 
 import click
 import csv
+import fnmatch
 import glob
+import io
 import json
 import os
 import re
+import stat
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from types import MappingProxyType
+from typing import IO, List, Dict, Any, Callable, Iterator, Mapping, Optional, Tuple, Union
 
 from __version__ import __version__
 
-# Column alias mapping - maps normalized header names to canonical field names
-COL_ALIASES = {
+# Column alias mapping - maps normalized header names to canonical field names.
+# Read-only: the default header index cache would go stale if it changed.
+COL_ALIASES = MappingProxyType({
     # exec_time aliases
     'exec time': 'exec_time',
     'execution time': 'exec_time',
@@ -65,7 +73,6 @@ COL_ALIASES = {
 
     # net_price aliases
     'net price': 'net_price',
-    'net price ': 'net_price',
 
     # price_improvement aliases
     'price improvement': 'price_improvement',
@@ -74,7 +81,6 @@ COL_ALIASES = {
     # order_type aliases
     'order type': 'order_type',
     'ordertype': 'order_type',
-    'order type ': 'order_type',
 
     # tif aliases
     'tif': 'tif',
@@ -88,7 +94,7 @@ COL_ALIASES = {
 
     # mark
     'mark': 'mark',
-}
+})
 
 # Default section detection patterns
 DEFAULT_SECTION_PATTERNS = {
@@ -124,6 +130,13 @@ DEFAULT_SECTION_PATTERNS = {
     r'(?i)^,Rolling Strategies': 'Rolling Strategies',
 }
 
+# Time column names that mark a row as a column header (with Side and Qty);
+# matched as substrings so suffixed headers like "Time Placed (ET)" count
+HEADER_TIME_TOKENS = ('exec time', 'time canceled', 'time placed')
+
+# Stripped cell values that mean "no value" ('~' and '-' are Schwab's null markers)
+NULL_TOKENS = frozenset(('', '~', '-'))
+
 # Regex patterns
 AMEND_REF_RE = re.compile(r'^RE\s*#\s*(\d+)', re.IGNORECASE)
 MONTH_MAP = {
@@ -132,6 +145,49 @@ MONTH_MAP = {
 }
 
 
+# Upper bound on threads listing pattern directories concurrently
+GLOB_SCAN_MAX_WORKERS = 8
+
+
+def _list_directory(base: str) -> List[str]:
+    """Entry names of a pattern's directory ('' is the current directory), or [] if unreadable."""
+    try:
+        with os.scandir(base or os.curdir) as entries:
+            return [entry.name for entry in entries]
+    except OSError:
+        return []
+
+
+def _glob_basename(pattern: str, dir_cache: Dict[str, List[str]]) -> List[str]:
+    """
+    glob.glob() for patterns whose wildcards are all in the final component.
+
+    Lists the directory with a single os.scandir() and filters names with
+    fnmatch, instead of glob's per-entry checks. Patterns with wildcards in
+    directory components go through glob.glob() unchanged.
+
+    Args:
+        pattern: Path pattern containing glob characters
+        dir_cache: Directory listings already read, shared across the
+            patterns of one expansion so each directory is scanned once
+
+    Returns:
+        Matching paths in directory order
+    """
+    base, tail = os.path.split(pattern)
+    if not tail or glob.has_magic(base):
+        return glob.glob(pattern)
+
+    names = dir_cache.get(base)
+    if names is None:
+        names = dir_cache[base] = _list_directory(base)
+
+    # Like glob, wildcards don't match hidden files unless the pattern asks for them
+    if not tail.startswith('.'):
+        names = [name for name in names if not name.startswith('.')]
+    return [os.path.join(base, name) for name in fnmatch.filter(names, tail)]
+
+
 def expand_glob_patterns(patterns: List[str]) -> List[str]:
     """
     Expand glob patterns in file paths.
@@ -149,12 +205,23 @@ def expand_glob_patterns(patterns: List[str]) -> List[str]:
         return []
 
     expanded = []
+    dir_cache = {}
+
+    # List the directories of basename globs up front; os.scandir releases the
+    # GIL, so several directories are read in parallel
+    scan_dirs = {
+        base for base, tail in (os.path.split(p) for p in patterns if glob.has_magic(p))
+        if tail and not glob.has_magic(base)
+    }
+    if len(scan_dirs) > 1:
+        with ThreadPoolExecutor(max_workers=min(GLOB_SCAN_MAX_WORKERS, len(scan_dirs))) as pool:
+            dir_cache.update(zip(scan_dirs, pool.map(_list_directory, scan_dirs)))
 
     for pattern in patterns:
         # Check if pattern contains glob characters
         if any(char in pattern for char in ['*', '?', '[']):
             # Expand glob pattern
-            matches = glob.glob(pattern)
+            matches = _glob_basename(pattern, dir_cache)
             if matches:
                 # Sort matches for consistency
                 expanded.extend(sorted(matches))
@@ -169,21 +236,159 @@ def expand_glob_patterns(patterns: List[str]) -> List[str]:
     return expanded
 
 
+@lru_cache(maxsize=32)
+def _read_section_patterns(path: str, mtime_ns: int) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Parse a patterns file; cached per (path, mtime) so edits are picked up."""
+    with open(path, 'r') as f:
+        return tuple(json.load(f).items())
+
+
+def load_section_patterns(path: Union[str, os.PathLike]) -> Dict[str, Optional[str]]:
+    """
+    Load a custom section patterns JSON file.
+
+    Repeated loads of an unchanged file are served from a cache; each call
+    returns a fresh dict so callers may modify it.
+
+    Args:
+        path: Path to a JSON object mapping regex patterns to section names
+
+    Returns:
+        Dict mapping regex patterns to section names
+    """
+    path = os.fspath(path)
+    return dict(_read_section_patterns(path, os.stat(path).st_mtime_ns))
+
+
+@lru_cache(maxsize=32)
+def _cached_compile(items: Tuple[Tuple[str, Optional[str]], ...]) -> Tuple[Tuple[re.Pattern, Optional[str]], ...]:
+    """Compile (pattern, section_name) pairs; cached per distinct pattern set."""
+    return tuple((re.compile(pattern_str), section_name) for pattern_str, section_name in items)
+
+
 def compile_section_patterns(patterns: Dict[str, str]) -> List[Tuple[re.Pattern, str]]:
     """
     Compile section pattern dictionary to list of (regex, section_name) tuples.
 
+    Compilation is cached on the dict's items, so parsing many files with the
+    same patterns compiles them once. Pattern order is preserved.
+
     Args:
         patterns: Dict mapping regex patterns to section names
 
     Returns:
         List of (compiled_pattern, section_name) tuples
     """
-    result = []
-    for pattern_str, section_name in patterns.items():
-        compiled = re.compile(pattern_str)
-        result.append((compiled, section_name))
-    return result
+    return list(_cached_compile(tuple(patterns.items())))
+
+
+# Leading global inline flags such as "(?i)" must become scoped "(?i:...)" groups
+# once a pattern is embedded in an alternation
+_LEADING_FLAGS_RE = re.compile(r'^\(\?([imsx]+)\)')
+# Backreferences and named groups change meaning or clash once patterns are combined
+_UNCOMBINABLE_RE = re.compile(r'\\[1-9]|\(\?P[<=]')
+# Characters that end a pattern's leading literal text, and the quantifiers among
+# them that make the preceding character optional or repeated
+_REGEX_META = frozenset('.^$*+?{}[]\\|()')
+_REGEX_QUANTIFIERS = frozenset('*+?{')
+
+
+def _anchored_prefix(pattern_str: str) -> Optional[str]:
+    """
+    Lowercase literal text that every match of a '^'-anchored pattern starts with.
+
+    Returns None when the pattern isn't simply anchored at the start of the row
+    (no '^', alternation, multiline or verbose flags) or has no ASCII literal
+    prefix, in which case the pattern can't be prefiltered.
+    """
+    flags = _LEADING_FLAGS_RE.match(pattern_str)
+    if flags:
+        if 'm' in flags.group(1) or 'x' in flags.group(1):
+            return None
+        pattern_str = pattern_str[flags.end():]
+    if not pattern_str.startswith('^') or '|' in pattern_str:
+        return None
+
+    prefix = []
+    for char in pattern_str[1:]:
+        if char in _REGEX_META:
+            if char in _REGEX_QUANTIFIERS and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+
+    literal = ''.join(prefix)
+    if not literal or not literal.isascii():
+        return None
+    return literal.lower()
+
+
+@lru_cache(maxsize=32)
+def _cached_union(
+    items: Tuple[Tuple[str, Optional[str]], ...]
+) -> Optional[Tuple[re.Pattern, Dict[int, Optional[str]], Optional[Tuple[str, ...]]]]:
+    """Combine (pattern, section_name) pairs into one regex; cached per pattern set."""
+    if not items:
+        return None
+
+    alternatives = []
+    prefixes = []
+    for pattern_str, _ in items:
+        if _UNCOMBINABLE_RE.search(pattern_str):
+            return None
+        prefix = _anchored_prefix(pattern_str)
+        prefixes.append(prefix)
+        flags = _LEADING_FLAGS_RE.match(pattern_str)
+        if flags:
+            pattern_str = f'(?{flags.group(1)}:{pattern_str[flags.end():]})'
+        # Each alternative is a lookahead from position 0 that behaves like
+        # pattern.search(), so alternation order keeps first-pattern-wins.
+        # Anchored patterns can only match at position 0 and skip the scan.
+        scan = '' if prefix is not None else '[\\s\\S]*?'
+        alternatives.append(f'(?={scan}({pattern_str}))')
+
+    try:
+        union = re.compile('|'.join(alternatives))
+    except re.error:
+        return None
+
+    # Map the wrapping group of each alternative to its section name
+    group_sections = {}
+    group = 1
+    for pattern_str, section_name in items:
+        group_sections[group] = section_name
+        group += 1 + re.compile(pattern_str).groups
+
+    # Rows can be rejected by prefix alone only if every pattern is anchored
+    row_prefixes = None if None in prefixes else tuple(prefixes)
+    return union, group_sections, row_prefixes
+
+
+def build_union_pattern(
+    patterns: Dict[str, str]
+) -> Optional[Tuple[re.Pattern, Dict[int, Optional[str]], Optional[Tuple[str, ...]]]]:
+    """
+    Combine section patterns into a single alternation matched once per row.
+
+    A match's lastindex identifies the first pattern (in dict order) that
+    would have matched on its own, so results equal a per-pattern scan.
+    When every pattern is '^'-anchored, their literal prefixes let rows that
+    start with none of them skip the regex entirely.
+
+    Args:
+        patterns: Dict mapping regex patterns to section names
+
+    Returns:
+        Tuple of (union_pattern, group_index -> section_name, row prefixes or
+        None), or None if the patterns can't be combined safely (callers fall
+        back to a per-pattern scan)
+    """
+    return _cached_union(tuple(patterns.items()))
+
+
+# DEFAULT_SECTION_PATTERNS compiled once at import, shared by every parse
+DEFAULT_COMPILED_PATTERNS = _cached_compile(tuple(DEFAULT_SECTION_PATTERNS.items()))
+DEFAULT_UNION_PATTERN = build_union_pattern(DEFAULT_SECTION_PATTERNS)
 
 
 def normalize_key(s: Optional[str]) -> str:
@@ -198,12 +403,9 @@ def normalize_key(s: Optional[str]) -> str:
     """
     if s is None:
         return ''
-    # Remove BOM if present
-    s = s.replace('\ufeff', '')
-    s = s.strip()
-    # Collapse multiple spaces to single space
-    s = re.sub(r'\s+', ' ', s)
-    return s.lower()
+    # Remove BOM if present, then strip and collapse whitespace runs in one
+    # split/join (str.split uses the same whitespace set as the regex \s)
+    return ' '.join(s.replace('\ufeff', '').split()).lower()
 
 
 # Section name normalization mapping
@@ -237,10 +439,37 @@ def normalize_section_name(section: Optional[str]) -> Optional[str]:
     return section
 
 
-def map_header_to_index(header: List[str], col_aliases: Dict[str, str] = None) -> Dict[str, int]:
+def _build_header_index(header, col_aliases: Mapping[str, str]) -> Dict[str, int]:
+    """Map header cells to {canonical_key: first column index} via col_aliases."""
+    result = {}
+
+    for idx, header_val in enumerate(header):
+        if not header_val:
+            continue
+
+        # Aliases are exact normalized names, so one dict probe resolves the
+        # cell; whitespace-only cells normalize to '' and never match
+        canonical_key = col_aliases.get(normalize_key(header_val))
+        # Only map first occurrence
+        if canonical_key is not None and canonical_key not in result:
+            result[canonical_key] = idx
+
+    return result
+
+
+@lru_cache(maxsize=128)
+def _cached_default_header_index(header: Tuple[Optional[str], ...]) -> Dict[str, int]:
+    """Header index for the default COL_ALIASES, cached per distinct header row."""
+    return _build_header_index(header, COL_ALIASES)
+
+
+def map_header_to_index(header: List[str], col_aliases: Mapping[str, str] = None) -> Dict[str, int]:
     """
     Map header row to dict of {canonical_key: column_index}.
 
+    With the default aliases the mapping is cached per header row, since the
+    same headers recur across sections and files.
+
     Args:
         header: List of header column names
         col_aliases: Column aliases dict (defaults to COL_ALIASES)
@@ -249,24 +478,9 @@ def map_header_to_index(header: List[str], col_aliases: Dict[str, str] = None) -
         Dict mapping canonical keys to column indices
     """
     if col_aliases is None:
-        col_aliases = COL_ALIASES
-
-    result = {}
+        return dict(_cached_default_header_index(tuple(header)))
 
-    for idx, header_val in enumerate(header):
-        if not header_val or not header_val.strip():
-            continue
-
-        normalized = normalize_key(header_val)
-
-        # Look up canonical key from alias
-        if normalized in col_aliases:
-            canonical_key = col_aliases[normalized]
-            # Only map first occurrence
-            if canonical_key not in result:
-                result[canonical_key] = idx
-
-    return result
+    return _build_header_index(header, col_aliases)
 
 
 def safe_get(cells: List[str], index: Optional[int], default=None) -> Optional[str]:
@@ -281,44 +495,83 @@ def safe_get(cells: List[str], index: Optional[int], default=None) -> Optional[s
     Returns:
         Cell value or None
     """
-    if index is None or index < 0:
-        return None
-    if index >= len(cells):
+    if index is None or not 0 <= index < len(cells):
         return None
 
     value = cells[index]
-    if not value or not value.strip():
+    if value is None:
         return None
 
     value = value.strip()
+    return None if value in NULL_TOKENS else value
 
-    # Treat ~ and - as null markers
-    if value in ('~', '-'):
-        return None
 
-    return value
+def match_section_row(
+    cells: List[str],
+    compiled_patterns: List[Tuple[re.Pattern, str]],
+    union: Optional[Tuple[re.Pattern, Dict[int, Optional[str]], Optional[Tuple[str, ...]]]] = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    Match a CSV row against section patterns.
+
+    Unlike detect_section_from_row, this tells a row matching an ignore
+    pattern (section name None) apart from a row matching nothing.
+
+    Args:
+        cells: CSV row cells
+        compiled_patterns: List of (pattern, section_name) tuples
+        union: Optional result of build_union_pattern for the same patterns,
+            used to match the row with one regex call
+
+    Returns:
+        Tuple of (matched, section_name) for the first matching pattern
+    """
+    # csv.reader rows are all str; convert None (or other) values only when
+    # the direct join fails
+    try:
+        row_str = ','.join(cells)
+    except TypeError:
+        row_str = ','.join(['' if cell is None else str(cell) for cell in cells])
+
+    if union is not None:
+        union_pattern, group_sections, prefixes = union
+        # Lowercasing is only an exact stand-in for IGNORECASE on ASCII text
+        if prefixes is not None and row_str.isascii() and not row_str.lower().startswith(prefixes):
+            return False, None
+        m = union_pattern.match(row_str)
+        if m is None:
+            return False, None
+        return True, group_sections[m.lastindex]
 
+    for pattern, section_name in compiled_patterns:
+        if pattern.search(row_str):
+            return True, section_name
+
+    return False, None
 
-def detect_section_from_row(cells: List[str], compiled_patterns: List[Tuple[re.Pattern, str]]) -> Optional[str]:
+
+def detect_section_from_row(
+    cells: List[str],
+    compiled_patterns: List[Tuple[re.Pattern, str]],
+    union: Optional[Tuple[re.Pattern, Dict[int, Optional[str]], Optional[Tuple[str, ...]]]] = None
+) -> Optional[str]:
     """
     Detect section name from CSV row using compiled patterns.
 
     Args:
         cells: CSV row cells
         compiled_patterns: List of (pattern, section_name) tuples
+        union: Optional result of build_union_pattern for the same patterns
 
     Returns:
         Section name if matched, else None
     """
-    # Convert None values to empty strings for pattern matching
-    safe_cells = ['' if cell is None else str(cell) for cell in cells]
-    row_str = ','.join(safe_cells)
+    return match_section_row(cells, compiled_patterns, union)[1]
 
-    for pattern, section_name in compiled_patterns:
-        if pattern.search(row_str):
-            return section_name
 
-    return None
+# Characters dropped from numeric cells in a single str.translate pass
+_QTY_STRIP = str.maketrans('', '', ',')
+_PRICE_STRIP = str.maketrans('', '', '$,')
 
 
 def parse_integer_qty(value: Optional[str], issues: List[str], unsigned: bool = False):
@@ -337,11 +590,21 @@ def parse_integer_qty(value: Optional[str], issues: List[str], unsigned: bool =
         return None
 
     value = value.strip()
-    if value in ('~', '-', ''):
+    if value in NULL_TOKENS:
         return None
 
-    # Remove commas and handle -+ signs
-    clean_value = value.replace(',', '').replace('-+', '-').replace('+-', '-')
+    # Fast path: plain signed integers, the common case
+    try:
+        num = int(value)
+    except ValueError:
+        pass
+    else:
+        return abs(num) if unsigned else num
+
+    # Remove commas and collapse a leading -+ or +- sign pair
+    clean_value = value.translate(_QTY_STRIP)
+    if clean_value[:2] in ('-+', '+-'):
+        clean_value = '-' + clean_value[2:]
 
     try:
         float_val = float(clean_value)
@@ -374,11 +637,17 @@ def parse_float_field(value: Optional[str], field_name: str, issues: List[str])
         return None
 
     value = value.strip()
-    if value in ('~', '-', ''):
+    if value in NULL_TOKENS:
         return None
 
+    # Fast path: plain numbers need no cleanup
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
     # Remove $ and commas
-    value = value.replace('$', '').replace(',', '')
+    value = value.translate(_PRICE_STRIP)
 
     # Handle leading decimal point
     if value.startswith('.') and value != '.':
@@ -446,183 +715,250 @@ def classify_row(cells: List[str]) -> str:
         if AMEND_REF_RE.match(c.strip()):
             return "amendment"
 
-    # Check for header row
-    normalized = [normalize_key(c) for c in cells]
-    joined = ','.join(normalized)
-
-    # Header indicators
-    has_time = any(t in joined for t in ['exec time', 'time canceled', 'time placed'])
-    has_trade_cols = 'side' in joined and 'qty' in joined
-
-    if has_time and has_trade_cols:
+    # Check for header row: a time column plus Side and Qty columns
+    joined = ','.join([normalize_key(c) for c in cells])
+    if 'side' in joined and 'qty' in joined and any(t in joined for t in HEADER_TIME_TOKENS):
         return "header"
 
     return "data"
 
 
-def build_order_record(
+# Event types of order rows, by normalized section name (anything else is 'other')
+SECTION_EVENT_TYPES = {
+    'Filled Orders': 'fill',
+    'Canceled Orders': 'cancel',
+    'Working Orders': 'working',
+}
+
+# Event types of Account Order History rows, by exact status
+STATUS_EVENT_TYPES = {
+    'FILLED': 'fill',
+    'CANCELED': 'cancel',
+    'REJECTED': 'cancel',
+}
+
+# Canonical fields read from order rows, in the order prepare_record_builder unpacks them
+ORDER_RECORD_FIELDS = (
+    'exec_time', 'time_canceled', 'spread', 'side', 'qty', 'pos_effect', 'symbol',
+    'exp', 'strike', 'type', 'price', 'net_price', 'price_improvement',
+    'order_type', 'tif', 'status', 'notes', 'mark',
+)
+
+
+def _clean_cell(value: Optional[str]) -> Optional[str]:
+    """safe_get() for a cell already known to be in range."""
+    if value is None:
+        return None
+    value = value.strip()
+    return None if value in NULL_TOKENS else value
+
+
+@lru_cache(maxsize=64)
+def _make_cell_extractor(indexes: Tuple[Optional[int], ...]) -> Callable[[List[str]], Tuple[Optional[str], ...]]:
+    """
+    Generate a function returning safe_get(cells, i) for each of indexes.
+
+    The column indexes are baked into the generated source as literals, so the
+    per-row call does no index lookups and skips columns the header lacks.
+    Cached per distinct index layout.
+    """
+    terms = [
+        'None' if i is None or i < 0 else f'_clean_cell(cells[{i}]) if n > {i} else None'
+        for i in indexes
+    ]
+    src = (
+        'def extract(cells):\n'
+        '    n = len(cells)\n'
+        '    return (\n'
+        + ''.join(f'        {term},\n' for term in terms)
+        + '    )\n'
+    )
+    namespace = {'_clean_cell': _clean_cell}
+    exec(compile(src, '<cell extractor>', 'exec'), namespace)
+    return namespace['extract']
+
+
+def prepare_record_builder(
     section: str,
     header_map: Dict[str, int],
-    cells: List[str],
-    row_index: int,
     qty_unsigned: bool = False,
     filter_triggered_rejected: bool = True
-) -> Optional[Dict[str, Any]]:
+) -> Callable[[List[str], int], Optional[Dict[str, Any]]]:
     """
-    Build order record from CSV row.
+    Prepare a per-row order record builder for one section and column header.
+
+    Column indexes and the section-derived event type are resolved once here,
+    so the returned function only indexes into each row's cells.
 
     Args:
         section: Section name
         header_map: Header mapping dict
-        cells: CSV row cells
-        row_index: Row index in file
         qty_unsigned: If True, quantities are unsigned
         filter_triggered_rejected: If True, filter out TRIGGERED and REJECTED rows
 
     Returns:
-        Record dict with unified schema or None
+        Function taking (cells, row_index) and returning a record dict or None
     """
-    issues = []
-
-    # Extract fields using header map
-    exec_time = safe_get(cells, header_map.get('exec_time'))
-    time_canceled = safe_get(cells, header_map.get('time_canceled'))
-    spread = safe_get(cells, header_map.get('spread'))
-    side = safe_get(cells, header_map.get('side'))
-    qty_str = safe_get(cells, header_map.get('qty'))
-    pos_effect = safe_get(cells, header_map.get('pos_effect'))
-    symbol = safe_get(cells, header_map.get('symbol'))
-    exp = safe_get(cells, header_map.get('exp'))
-    strike_str = safe_get(cells, header_map.get('strike'))
-    type_str = safe_get(cells, header_map.get('type'))
-    price_str = safe_get(cells, header_map.get('price'))
-    net_price_str = safe_get(cells, header_map.get('net_price'))
-    price_impr_str = safe_get(cells, header_map.get('price_improvement'))
-    order_type = safe_get(cells, header_map.get('order_type'))
-    tif = safe_get(cells, header_map.get('tif'))
-    status = safe_get(cells, header_map.get('status'))
-    notes = safe_get(cells, header_map.get('notes'))
-    mark_str = safe_get(cells, header_map.get('mark'))
-
-    # Normalize string fields
-    if side:
-        side = side.upper()
-    if pos_effect:
-        pos_effect = pos_effect.upper()
-    if symbol:
-        symbol = symbol.upper()
-    if type_str:
-        type_str = type_str.upper()
-    if order_type:
-        order_type = order_type.upper()
-    if tif:
-        tif = tif.upper()
-    if status:
-        status = status.upper()
-
-    # Filter out TRIGGERED and REJECTED status rows (non-trade rows)
-    if filter_triggered_rejected and status:
-        if status == 'TRIGGERED' or status.startswith('REJECTED'):
+    extract = _make_cell_extractor(tuple(header_map.get(field) for field in ORDER_RECORD_FIELDS))
+    normalized_section = normalize_section_name(section)
+    status_driven = normalized_section == 'Account Order History'
+
+    # Event type for sections that don't derive it from the status column
+    section_event_type = SECTION_EVENT_TYPES.get(normalized_section, 'other')
+
+    # Parse issues are collected in one reused list; a record only gets its
+    # own copy when something failed, which is rare
+    scratch_issues = []
+
+    def build(cells: List[str], row_index: int) -> Optional[Dict[str, Any]]:
+        # Extract fields using header map
+        (exec_time, time_canceled, spread, side, qty_str, pos_effect, symbol,
+         exp, strike_str, type_str, price_str, net_price_str, price_impr_str,
+         order_type, tif, status, notes, mark_str) = extract(cells)
+
+        # Normalize string fields
+        if side:
+            side = side.upper()
+        if pos_effect:
+            pos_effect = pos_effect.upper()
+        if symbol:
+            symbol = symbol.upper()
+        if type_str:
+            type_str = type_str.upper()
+        if order_type:
+            order_type = order_type.upper()
+        if tif:
+            tif = tif.upper()
+        if status:
+            status = status.upper()
+
+        # Filter out TRIGGERED and REJECTED status rows (non-trade rows)
+        if filter_triggered_rejected and status:
+            if status == 'TRIGGERED' or status.startswith('REJECTED'):
+                return None
+
+        # Skip rows with no meaningful data
+        if not side and not qty_str and not symbol and not type_str:
             return None
 
-    # Skip rows with no meaningful data
-    if not side and not qty_str and not symbol and not type_str:
-        return None
+        # Parse numeric fields
+        issues = scratch_issues
+        issues.clear()
+        qty = parse_integer_qty(qty_str, issues, unsigned=qty_unsigned)
+        price = parse_float_field(price_str, 'price', issues)
+        net_price = parse_float_field(net_price_str, 'net_price', issues)
+        price_improvement = parse_float_field(price_impr_str, 'price_improvement', issues)
+        strike = parse_float_field(strike_str, 'strike', issues)
+        mark = parse_float_field(mark_str, 'mark', issues)
+        issues = issues.copy()
+
+        # Determine asset type
+        asset_type = None
+        if type_str in {'CALL', 'PUT'}:
+            asset_type = 'OPTION'
+        elif type_str == 'STOCK':
+            asset_type = 'STOCK'
+        elif type_str == 'ETF':
+            asset_type = 'ETF'
+
+        # Build option object
+        option = None
+        exp_date = None
+        if asset_type == 'OPTION':
+            exp_date = parse_exp_date(exp)
+            option = {
+                'exp_date': exp_date,
+                'strike': strike,
+                'right': type_str,
+            }
+
+        # Determine event type
+        # For Account Order History section, use status field to determine event_type
+        if status_driven and status:
+            # Map status to event_type for mixed-status sections
+            event_type = STATUS_EVENT_TYPES.get(status)
+            if event_type is None:
+                # Handle detailed rejection messages
+                # e.g., "REJECTED: THIS ORDER MAY RESULT IN AN OVERSOLD/OVERBOUGHT POSITION..."
+                event_type = 'cancel' if status.startswith('REJECTED') else 'other'
+        # For other sections, use normalized section name
+        else:
+            event_type = section_event_type
+
+        # Build unified record with ALL fields
+        return {
+            'section': normalized_section,
+            'row_index': row_index,
+            'raw': ','.join(cells),
+            'issues': issues,
+
+            # Time fields
+            'exec_time': parse_datetime_maybe(exec_time),
+            'time_canceled': parse_datetime_maybe(time_canceled),
+            'time_placed': None,  # Not in order records
+
+            # Trade fields
+            'side': side,
+            'qty': qty,
+            'pos_effect': pos_effect,
+            'symbol': symbol,
+
+            # Option fields
+            'exp': exp_date,
+            'strike': strike if option else None,
+            'type': type_str,
+            'spread': spread,
+
+            # Price fields
+            'price': price,
+            'net_price': net_price,
+            'price_improvement': price_improvement,
+
+            # Order fields
+            'order_type': order_type,
+            'tif': tif,
+            'status': status,
+
+            # Other fields
+            'notes': notes,
+            'mark': mark,
 
-    # Parse numeric fields
-    qty = parse_integer_qty(qty_str, issues, unsigned=qty_unsigned)
-    price = parse_float_field(price_str, 'price', issues)
-    net_price = parse_float_field(net_price_str, 'net_price', issues)
-    price_improvement = parse_float_field(price_impr_str, 'price_improvement', issues)
-    strike = parse_float_field(strike_str, 'strike', issues)
-    mark = parse_float_field(mark_str, 'mark', issues)
-
-    # Determine asset type
-    asset_type = None
-    if type_str in {'CALL', 'PUT'}:
-        asset_type = 'OPTION'
-    elif type_str == 'STOCK':
-        asset_type = 'STOCK'
-    elif type_str == 'ETF':
-        asset_type = 'ETF'
-
-    # Build option object
-    option = None
-    if asset_type == 'OPTION':
-        option = {
-            'exp_date': parse_exp_date(exp),
-            'strike': strike,
-            'right': type_str,
+            # Legacy fields (for backward compat)
+            'event_type': event_type,
+            'asset_type': asset_type,
+            'option': option,
         }
 
-    # Determine event type
-    # For Account Order History section, use status field to determine event_type
-    normalized_section = normalize_section_name(section)
-    if normalized_section == 'Account Order History' and status:
-        # Map status to event_type for mixed-status sections
-        if status == 'FILLED':
-            event_type = 'fill'
-        elif status == 'CANCELED' or status.startswith('REJECTED'):
-            # Handle both simple "REJECTED" and detailed rejection messages
-            # e.g., "REJECTED: THIS ORDER MAY RESULT IN AN OVERSOLD/OVERBOUGHT POSITION..."
-            event_type = 'cancel'
-        else:
-            event_type = 'other'
-    # For other sections, use normalized section name
-    elif normalized_section == 'Filled Orders':
-        event_type = 'fill'
-    elif normalized_section == 'Canceled Orders':
-        event_type = 'cancel'
-    elif normalized_section == 'Working Orders':
-        event_type = 'working'
-    else:
-        event_type = 'other'
+    return build
 
-    # Build unified record with ALL fields
-    record = {
-        'section': normalize_section_name(section),
-        'row_index': row_index,
-        'raw': ','.join(cells),
-        'issues': issues,
 
-        # Time fields
-        'exec_time': parse_datetime_maybe(exec_time),
-        'time_canceled': parse_datetime_maybe(time_canceled),
-        'time_placed': None,  # Not in order records
-
-        # Trade fields
-        'side': side,
-        'qty': qty,
-        'pos_effect': pos_effect,
-        'symbol': symbol,
-
-        # Option fields
-        'exp': parse_exp_date(exp) if option else None,
-        'strike': strike if option else None,
-        'type': type_str,
-        'spread': spread,
-
-        # Price fields
-        'price': price,
-        'net_price': net_price,
-        'price_improvement': price_improvement,
-
-        # Order fields
-        'order_type': order_type,
-        'tif': tif,
-        'status': status,
-
-        # Other fields
-        'notes': notes,
-        'mark': mark,
-
-        # Legacy fields (for backward compat)
-        'event_type': event_type,
-        'asset_type': asset_type,
-        'option': option,
-    }
+def build_order_record(
+    section: str,
+    header_map: Dict[str, int],
+    cells: List[str],
+    row_index: int,
+    qty_unsigned: bool = False,
+    filter_triggered_rejected: bool = True
+) -> Optional[Dict[str, Any]]:
+    """
+    Build order record from CSV row.
 
-    return record
+    Parsing many rows under the same header should reuse a builder from
+    prepare_record_builder instead.
+
+    Args:
+        section: Section name
+        header_map: Header mapping dict
+        cells: CSV row cells
+        row_index: Row index in file
+        qty_unsigned: If True, quantities are unsigned
+        filter_triggered_rejected: If True, filter out TRIGGERED and REJECTED rows
+
+    Returns:
+        Record dict with unified schema or None
+    """
+    build = prepare_record_builder(section, header_map, qty_unsigned, filter_triggered_rejected)
+    return build(cells, row_index)
 
 
 def build_amendment_record(section: str, cells: List[str], row_index: int) -> Dict[str, Any]:
@@ -663,8 +999,69 @@ def build_amendment_record(section: str, cells: List[str], row_index: int) -> Di
     return record
 
 
+# A CSV input: a filesystem path or an already-open text/binary stream
+CsvSource = Union[str, os.PathLike, IO]
+
+# Input files are read through a large buffer so csv.reader's line pulls are
+# served from memory instead of many small reads
+INPUT_BUFFER_SIZE = 1 << 20
+
+
+@contextmanager
+def open_csv_source(source: CsvSource) -> Iterator[IO[str]]:
+    """
+    Open a CSV source for reading as text.
+
+    Paths are opened (and closed) here. Streams are read as given and left
+    open for the caller; paths and binary streams are decoded as UTF-8 with
+    a leading byte order mark dropped.
+
+    Args:
+        source: Path to CSV file, or an open text or binary stream
+
+    Yields:
+        Text stream suitable for csv.reader
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', buffering=INPUT_BUFFER_SIZE, encoding='utf-8-sig',
+                  errors='ignore', newline='') as f:
+            yield f
+    elif isinstance(source, io.TextIOBase):
+        yield source
+    else:
+        wrapper = io.TextIOWrapper(source, encoding='utf-8-sig', errors='ignore', newline='')
+        try:
+            yield wrapper
+        finally:
+            # Leave the caller's binary stream open
+            wrapper.detach()
+
+
+# Order fields that are always None on section/column header records
+SECTION_HEADER_NULL_FIELDS = dict.fromkeys((
+    'exec_time', 'time_canceled', 'time_placed',
+    'side', 'qty', 'pos_effect', 'symbol',
+    'exp', 'strike', 'type', 'spread',
+    'price', 'net_price', 'price_improvement',
+    'order_type', 'tif', 'status',
+    'notes', 'mark',
+))
+
+
+def build_section_header_record(section: str, cells: List[str], row_index: int) -> Dict[str, Any]:
+    """Build section/column header record with all order fields set to None."""
+    record = {
+        'section': normalize_section_name(section),
+        'row_index': row_index,
+        'raw': ','.join(cells),
+        'issues': ['section_header'],
+    }
+    record.update(SECTION_HEADER_NULL_FIELDS)
+    return record
+
+
 def parse_file(
-    path: str,
+    path: CsvSource,
     include_rolling: bool = False,
     section_patterns: Dict[str, str] = None,
     max_rows: int = None,
@@ -677,7 +1074,7 @@ def parse_file(
     Parse Schwab CSV file to records.
 
     Args:
-        path: Path to CSV file
+        path: Path to CSV file, or an open text or binary stream
         include_rolling: Include Rolling Strategies section
         section_patterns: Custom section patterns dict
         max_rows: Max rows to process (for testing)
@@ -701,40 +1098,41 @@ def parse_file(
     buffered_column_header = None
     buffered_header_map = None
 
-    if section_patterns is None:
-        section_patterns = DEFAULT_SECTION_PATTERNS
+    # Order record builder for the current header map
+    record_builder = None
+    record_builder_map = None
 
-    compiled_patterns = compile_section_patterns(section_patterns)
+    if section_patterns is None:
+        compiled_patterns = DEFAULT_COMPILED_PATTERNS
+        union = DEFAULT_UNION_PATTERN
+    else:
+        compiled_patterns = compile_section_patterns(section_patterns)
+        union = build_union_pattern(section_patterns)
 
-    with open(path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+    with open_csv_source(path) as f:
+        # csv.reader yields a fresh list per row, so rows are used as-is
         reader = csv.reader(f)
-        for row in reader:
+        for cells in reader:
             if max_rows and row_index >= max_rows:
                 break
 
             row_index += 1
-            cells = [c for c in row]
 
             if verbose:
                 click.echo(f"Row {row_index}: {cells[:3]}...", err=True)
 
             # Check for section header
-            detected_section = detect_section_from_row(cells, compiled_patterns)
+            matched, detected_section = match_section_row(cells, compiled_patterns, union)
 
             # Handle ignored sections (where pattern maps to None)
-            if detected_section is None:
-                # Check if this row matches an ignore pattern
-                row_str = ','.join(['' if c is None else str(c) for c in cells])
-                for pattern, section_name in compiled_patterns:
-                    if section_name is None and pattern.search(row_str):
-                        # This is an ignored section - clear current section
-                        if verbose:
-                            click.echo(f"Ignoring section at row {row_index}: {cells[0] if cells else ''}", err=True)
-                        section = None
-                        in_data = False
-                        current_header_map = None
-                        buffered_header_map = None
-                        break
+            if matched and detected_section is None:
+                # This is an ignored section - clear current section
+                if verbose:
+                    click.echo(f"Ignoring section at row {row_index}: {cells[0] if cells else ''}", err=True)
+                section = None
+                in_data = False
+                current_header_map = None
+                buffered_header_map = None
 
             if detected_section:
                 # If we had buffered headers, they belong to an empty section
@@ -749,19 +1147,7 @@ def parse_file(
                 buffered_header_map = None
 
                 # Create section header record
-                section_header_record = {
-                    'section': normalize_section_name(section),
-                    'row_index': row_index,
-                    'raw': ','.join(cells),
-                    'issues': ['section_header'],
-                    # All other fields as None
-                    'exec_time': None, 'time_canceled': None, 'time_placed': None,
-                    'side': None, 'qty': None, 'pos_effect': None, 'symbol': None,
-                    'exp': None, 'strike': None, 'type': None, 'spread': None,
-                    'price': None, 'net_price': None, 'price_improvement': None,
-                    'order_type': None, 'tif': None, 'status': None,
-                    'notes': None, 'mark': None,
-                }
+                section_header_record = build_section_header_record(section, cells, row_index)
 
                 # Check if this row is ALSO a column header (some patterns match both)
                 cls = classify_row(cells)
@@ -807,19 +1193,7 @@ def parse_file(
                 header_map = map_header_to_index(cells)
 
                 # Create header record
-                header_record = {
-                    'section': normalize_section_name(section),
-                    'row_index': row_index,
-                    'raw': ','.join(cells),
-                    'issues': ['section_header'],
-                    # All other fields as None
-                    'exec_time': None, 'time_canceled': None, 'time_placed': None,
-                    'side': None, 'qty': None, 'pos_effect': None, 'symbol': None,
-                    'exp': None, 'strike': None, 'type': None, 'spread': None,
-                    'price': None, 'net_price': None, 'price_improvement': None,
-                    'order_type': None, 'tif': None, 'status': None,
-                    'notes': None, 'mark': None,
-                }
+                header_record = build_section_header_record(section, cells, row_index)
 
                 if skip_empty_sections:
                     # Buffer the column header
@@ -856,7 +1230,15 @@ def parse_file(
                 results.append(build_amendment_record(section, cells, row_index))
                 continue
 
-            rec = build_order_record(section, current_header_map, cells, row_index, qty_unsigned, filter_triggered_rejected)
+            # Every section or column header change installs a new header map
+            # object, so identity tells when the builder must be rebuilt
+            if record_builder_map is not current_header_map:
+                record_builder = prepare_record_builder(
+                    section, current_header_map, qty_unsigned, filter_triggered_rejected
+                )
+                record_builder_map = current_header_map
+
+            rec = record_builder(cells, row_index)
             if rec:
                 results.append(rec)
 
@@ -891,9 +1273,10 @@ def validate(records: List[Dict[str, Any]]) -> Dict[str, int]:
 
         et = r.get('event_type')
         if et == 'amend':
-            if not r.get('amendment', {}).get('ref'):
+            amendment = r.get('amendment', {})
+            if not amendment.get('ref'):
                 bump('amend_missing_ref')
-            if r.get('amendment', {}).get('stop_price') is None:
+            if amendment.get('stop_price') is None:
                 bump('amend_missing_stop_price')
             continue
 
@@ -919,6 +1302,141 @@ def validate(records: List[Dict[str, Any]]) -> Dict[str, int]:
     return issues
 
 
+# Output files are written in binary mode through a large buffer; JSON text is
+# encoded to UTF-8 once per write instead of going through a text wrapper.
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def iter_json_chunks(records: List[Dict[str, Any]], output_json: bool = False,
+                     pretty: bool = False) -> Iterator[str]:
+    """
+    Serialize records as NDJSON lines, or as a single JSON array string.
+
+    Shared by the text-stream and file writers so both produce the same output.
+
+    Args:
+        records: List of record dicts
+        output_json: Produce a JSON array instead of NDJSON
+        pretty: Indent the JSON array (only with output_json)
+
+    Yields:
+        JSON text chunks, in output order
+    """
+    if output_json:
+        yield json.dumps(records, ensure_ascii=False, indent=2 if pretty else None)
+    else:
+        dumps = json.dumps
+        for r in records:
+            yield dumps(r, ensure_ascii=False) + '\n'
+
+
+def write_records(records: List[Dict[str, Any]], out: IO[str], output_json: bool = False,
+                  pretty: bool = False) -> None:
+    """
+    Serialize records to an open text stream as NDJSON or a JSON array.
+
+    Args:
+        records: List of record dicts
+        out: Writable text stream
+        output_json: Write a JSON array instead of NDJSON
+        pretty: Indent the JSON array (only with output_json)
+    """
+    out.writelines(iter_json_chunks(records, output_json, pretty))
+
+
+def write_output(records: List[Dict[str, Any]], output_path: str, output_json: bool = False,
+                 pretty: bool = False) -> None:
+    """
+    Write records to an output file as NDJSON or a JSON array.
+
+    Args:
+        records: List of record dicts
+        output_path: Path to output file
+        output_json: Write a JSON array instead of NDJSON
+        pretty: Indent the JSON array (only with output_json)
+    """
+    with open(output_path, 'wb', buffering=OUTPUT_BUFFER_SIZE) as out:
+        write = out.write
+        for chunk in iter_json_chunks(records, output_json, pretty):
+            write(chunk.encode('utf-8'))
+
+
+def write_ndjson(records: List[Dict[str, Any]], output_path: str) -> None:
+    """
+    Write records as NDJSON (one JSON object per line).
+
+    Args:
+        records: List of record dicts
+        output_path: Path to output file
+    """
+    write_output(records, output_path)
+
+
+def write_json_array(records: List[Dict[str, Any]], output_path: str, pretty: bool = False) -> None:
+    """
+    Write records as a single JSON array.
+
+    Args:
+        records: List of record dicts
+        output_path: Path to output file
+        pretty: Indent the array for readability
+    """
+    write_output(records, output_path, output_json=True, pretty=pretty)
+
+
+def convert_stream(
+    input_stream: CsvSource,
+    output_stream: IO[str],
+    *,
+    output_json: bool = False,
+    pretty: bool = False,
+    include_rolling: bool = False,
+    section_patterns: Dict[str, str] = None,
+    max_rows: int = None,
+    qty_unsigned: bool = False,
+    verbose: bool = False,
+    skip_empty_sections: bool = True,
+    filter_triggered_rejected: bool = True
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Convert one CSV source to JSON text written to an open text stream.
+
+    This is the single-file conversion without the CLI layer: no path
+    validation, no summary output and no files opened on the output side.
+    Defaults match the ``convert`` command.
+
+    Args:
+        input_stream: CSV path, or an open text or binary stream
+        output_stream: Writable text stream receiving the JSON output
+        output_json: Write a JSON array instead of NDJSON
+        pretty: Indent the JSON array (only with output_json)
+        include_rolling: Include Rolling Strategies section
+        section_patterns: Custom section patterns dict
+        max_rows: Max rows to process
+        qty_unsigned: Parse quantities as unsigned
+        verbose: Enable verbose logging
+        skip_empty_sections: Skip sections with only headers (no data rows)
+        filter_triggered_rejected: Filter out TRIGGERED and REJECTED status rows
+
+    Returns:
+        Tuple of (list of record dicts, count of skipped sections)
+    """
+    records, sections_skipped = parse_file(
+        input_stream,
+        include_rolling=include_rolling,
+        section_patterns=section_patterns,
+        max_rows=max_rows,
+        qty_unsigned=qty_unsigned,
+        verbose=verbose,
+        skip_empty_sections=skip_empty_sections,
+        filter_triggered_rejected=filter_triggered_rejected
+    )
+
+    write_records(records, output_stream, output_json=output_json, pretty=pretty)
+
+    return records, sections_skipped
+
+
 def normalize_path(path_str: str) -> Path:
     """
     Normalize file path to absolute, resolved path.
@@ -945,18 +1463,41 @@ def validate_output_not_input(input_paths: List[str], output_path: str) -> Optio
     Returns:
         Error message if collision detected, None if valid
     """
-    output_normalized = normalize_path(output_path)
-    input_normalized = [normalize_path(p) for p in input_paths]
+    try:
+        output_stat = os.stat(output_path)
+    except OSError:
+        output_stat = None
+
+    if output_stat is None:
+        # Nothing exists at the output path yet, so it can only name the same
+        # (equally missing) file as an input lexically; no resolving needed
+        output_normalized = os.path.normpath(os.path.abspath(output_path))
+        collision = next(
+            (p for p in input_paths if os.path.normpath(os.path.abspath(p)) == output_normalized),
+            None
+        )
+    else:
+        # Compare file identity: one stat per input instead of resolving every
+        # path component, and hard links to an input are caught too
+        output_key = (output_stat.st_dev, output_stat.st_ino)
+        collision = None
+        for p in input_paths:
+            try:
+                input_stat = os.stat(p)
+            except OSError:
+                continue
+            if (input_stat.st_dev, input_stat.st_ino) == output_key:
+                collision = p
+                break
 
-    for input_path in input_normalized:
-        if output_normalized == input_path:
-            return (
-                f"Error: Output file would overwrite input file\n"
-                f"  Output: {output_path}\n"
-                f"  Collides with input: {input_path}\n\n"
-                f"Suggestion: Specify a different output file name:\n"
-                f"  uv run python main.py convert [input files...] output.ndjson"
-            )
+    if collision is not None:
+        return (
+            f"Error: Output file would overwrite input file\n"
+            f"  Output: {output_path}\n"
+            f"  Collides with input: {normalize_path(collision)}\n\n"
+            f"Suggestion: Specify a different output file name:\n"
+            f"  uv run python main.py convert [input files...] output.ndjson"
+        )
 
     return None
 
@@ -994,10 +1535,13 @@ def validate_input_files_exist(input_paths: List[str]) -> List[str]:
     errors = []
 
     for path_str in input_paths:
-        path = Path(path_str)
-        if not path.exists():
+        # One stat answers both "exists" and "is a regular file"
+        try:
+            mode = os.stat(path_str).st_mode
+        except OSError:
             errors.append(f"Error: Input file does not exist: {path_str}")
-        elif not path.is_file():
+            continue
+        if not stat.S_ISREG(mode):
             errors.append(f"Error: Input path is not a file: {path_str}")
 
     return errors
@@ -1020,13 +1564,16 @@ def validate_output_directory(output_path: str) -> Optional[str]:
     if parent_dir == Path('.'):
         parent_dir = Path.cwd()
 
-    if not parent_dir.exists():
+    # One stat answers both "exists" and "is a directory"
+    try:
+        mode = os.stat(parent_dir).st_mode
+    except OSError:
         return (
             f"Error: Output directory does not exist: {parent_dir}\n"
             f"  Create the directory first or specify a different path."
         )
 
-    if not parent_dir.is_dir():
+    if not stat.S_ISDIR(mode):
         return f"Error: Output parent path is not a directory: {parent_dir}"
 
     # Check if directory is writable
@@ -1107,12 +1654,14 @@ def cli():
               help='Group records by section across files and sort by time (default: group)')
 @click.option('--filter-triggered-rejected/--include-all-statuses', default=True,
               help='Filter out TRIGGERED and REJECTED status rows (default: filter)')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Number of worker processes for multi-file batches')
 @click.option('--force-overwrite', is_flag=True, help='Force overwrite without safety checks (use with caution)')
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
 @click.option('--encoding', default='utf-8', help='CSV file encoding (default: utf-8)')
 def convert(input_csv, output_json, include_rolling, format_json, output_ndjson, pretty,
          preview, section_patterns_file, max_rows, qty_unsigned, qty_signed,
-         skip_empty_sections, group_by_section, filter_triggered_rejected, force_overwrite, verbose, encoding):
+         skip_empty_sections, group_by_section, filter_triggered_rejected, jobs, force_overwrite, verbose, encoding):
     """
     Convert Schwab CSV trade activity reports to JSON/NDJSON format.
 
@@ -1163,8 +1712,7 @@ def convert(input_csv, output_json, include_rolling, format_json, output_ndjson,
     # Load custom section patterns if provided
     section_patterns = None
     if section_patterns_file:
-        with open(section_patterns_file, 'r') as f:
-            section_patterns = json.load(f)
+        section_patterns = load_section_patterns(section_patterns_file)
 
     # Determine if we're in batch mode (multiple files)
     is_batch_mode = len(input_files) > 1
@@ -1182,7 +1730,8 @@ def convert(input_csv, output_json, include_rolling, format_json, output_ndjson,
             verbose=verbose,
             skip_empty_sections=skip_empty_sections,
             group_by_section=group_by_section,
-            filter_triggered_rejected=filter_triggered_rejected
+            filter_triggered_rejected=filter_triggered_rejected,
+            max_workers=jobs
         )
 
         # Progress callback for verbose mode
@@ -1241,26 +1790,18 @@ def convert(input_csv, output_json, include_rolling, format_json, output_ndjson,
             filter_triggered_rejected=filter_triggered_rejected
         )
 
-        # Validate records
-        validation_issues = validate(records)
+        # Write output only after a successful parse, so a failed run leaves no
+        # file behind and an input overwritten with --force-overwrite is read first
+        # (JSON array for --output-json or a .json path, else NDJSON)
+        write_output(records, output_json, output_json=format_json or output_json.endswith('.json'),
+                     pretty=pretty)
+
+        # Validate records (nothing to scan for an empty parse)
+        validation_issues = validate(records) if records else {}
 
         if sections_skipped > 0 and verbose:
             click.echo(f"Skipped {sections_skipped} empty section(s)", err=True)
 
-        # Write output
-        if format_json or output_json.endswith('.json'):
-            # JSON array format
-            with open(output_json, 'w', encoding='utf-8') as out:
-                if pretty:
-                    json.dump(records, out, ensure_ascii=False, indent=2)
-                else:
-                    json.dump(records, out, ensure_ascii=False)
-        else:
-            # NDJSON format (default)
-            with open(output_json, 'w', encoding='utf-8') as out:
-                for r in records:
-                    out.write(json.dumps(r, ensure_ascii=False) + '\n')
-
         click.echo(f"Parsed records: {len(records)}", err=True)
 
     # Print validation summary (for both modes)
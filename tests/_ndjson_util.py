@@ -0,0 +1,54 @@
+"""NDJSON helpers shared by the test modules."""
+import mmap
+import os
+import re
+from pathlib import Path
+
+# loads parses one JSON document from str or bytes. orjson accepts both and is
+# much faster on the per-line loops in the tests; it is an optional dev dependency.
+try:
+    from orjson import loads
+except ImportError:  # the stdlib parser also accepts str and bytes
+    from json import loads
+
+
+def load_ndjson(path):
+    """Read an NDJSON file in one call and parse each non-empty line."""
+    return [loads(line) for line in Path(path).read_bytes().split(b'\n') if line]
+
+
+def iter_ndjson(path):
+    """Lazily parse an NDJSON file one line at a time in constant memory."""
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+def count_lines(path, chunk_size=1 << 16):
+    """Count newline-terminated lines by scanning fixed-size byte chunks."""
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(chunk_size), b''))
+
+
+def first_and_rest(path):
+    """Return the first NDJSON record and a lazy iterator over the remainder."""
+    records = iter_ndjson(path)
+    return next(records), records
+
+
+def contains_json_kv(path, key, value):
+    """
+    Return True if any record in an NDJSON file has the string field key == value.
+
+    Scans the raw bytes through mmap instead of parsing JSON, so it only
+    suits existence checks on plain ASCII string values.
+    """
+    pattern = re.compile(
+        b'"' + re.escape(key.encode()) + rb'"\s*:\s*"' + re.escape(value.encode()) + b'"'
+    )
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:  # mmap rejects empty files
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return pattern.search(mm) is not None
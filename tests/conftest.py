@@ -0,0 +1,155 @@
+"""Shared pytest fixtures for the test suite."""
+import json
+from dataclasses import dataclass
+
+import pytest
+from click.testing import CliRunner
+
+
+FILLED_HEADER = ',,Exec Time,Side,Qty,Symbol,Price'
+
+# Canonical CSV inputs reused across tests, keyed by corpus name
+CSV_CORPUS = {
+    'filled_single': [
+        FILLED_HEADER,
+        ',,10/24/25,SELL,100,TEST,10.50',
+    ],
+    'filled_three_rows': [
+        FILLED_HEADER,
+        ',,10/24/25,SELL,100,AAA,10.0',
+        ',,10/24/25,BUY,200,BBB,20.0',
+        ',,10/24/25,SELL,300,CCC,30.0',
+    ],
+    'missing_symbol': [
+        FILLED_HEADER,
+        ',,10/24/25,SELL,100,,10.50',
+    ],
+    'missing_qty': [
+        FILLED_HEADER,
+        ',,10/24/25,BUY,,TEST,20.50',
+    ],
+    'rolling_strategies': [
+        'Rolling Strategies',
+        'Covered Call Position,New Exp,Call By',
+        'Position1,10/25/25,Data',
+    ],
+    'non_ascii': [
+        FILLED_HEADER,
+        ',,10/24/25,SELL,100,CAFÉ,10.50',
+    ],
+    'bom_header': [
+        '\ufeff' + FILLED_HEADER,
+        ',,10/24/25,SELL,100,TEST,10.50',
+    ],
+    'empty': [],
+}
+
+
+def write_csv(path, rows):
+    """
+    Write CSV rows to path in a single call and return the path.
+
+    Rows are encoded once and written as bytes, so line endings stay '\n'
+    on every platform.
+    """
+    path.write_bytes(('\n'.join(rows) + '\n').encode('utf-8') if rows else b'')
+    return path
+
+
+@pytest.fixture(scope='session')
+def runner():
+    """CliRunner shared by the whole session; it holds no per-invoke state."""
+    return CliRunner()
+
+
+@pytest.fixture(scope='session')
+def csv_corpus(tmp_path_factory):
+    """
+    Materialize CSV_CORPUS once per session; maps corpus name to file path.
+
+    Tests must treat these files as read-only. Under pytest-xdist each worker
+    gets its own tmp_path_factory root, so workers never share the corpus.
+    """
+    corpus_dir = tmp_path_factory.mktemp('corpus')
+    return {
+        name: str(write_csv(corpus_dir / f'{name}.csv', rows))
+        for name, rows in CSV_CORPUS.items()
+    }
+
+
+@pytest.fixture(scope='session')
+def csv_corpus_text():
+    """CSV_CORPUS as in-memory CSV text, for tests that convert from streams."""
+    return {
+        name: '\n'.join(rows) + '\n' if rows else ''
+        for name, rows in CSV_CORPUS.items()
+    }
+
+
+@pytest.fixture
+def make_csv(tmp_path):
+    """Factory writing a one-off CSV into the test's tmp_path."""
+    def _make_csv(name, rows):
+        return str(write_csv(tmp_path / name, rows))
+    return _make_csv
+
+
+@pytest.fixture(scope='session')
+def multi_section_csv(tmp_path_factory):
+    """CSV with Working, Filled and Canceled sections, one data row each."""
+    return write_csv(tmp_path_factory.mktemp('csvs') / 'multi_section.csv', [
+        'Working Orders',
+        'Notes,,Time Placed,Side,Qty,Symbol',
+        ',,10/24/25 08:00:00,BUY,50,WORK',
+        '',
+        'Filled Orders',
+        ',,Exec Time,Spread,Side,Qty,Symbol,Price,Net Price,Order Type',
+        ',,10/24/25 09:51:38,STOCK,SELL,-75,NEUP,8.30,8.30,MKT',
+        '',
+        'Canceled Orders',
+        'Notes,,Time Canceled,Side,Qty,Symbol',
+        ',,10/24/25 07:00:00,SELL,100,CANCEL',
+    ])
+
+
+@pytest.fixture(scope='session')
+def canceled_orders_csv(tmp_path_factory):
+    """Canceled Orders section with a priced row and a '~' (unpriced) row."""
+    return write_csv(tmp_path_factory.mktemp('csvs') / 'canceled_orders.csv', [
+        'Canceled Orders',
+        'Notes,,Time Canceled,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,PRICE,,TIF,Status',
+        ',,10/24/25 09:51:36,STOCK,SELL,-75,TO CLOSE,NEUP,,,STOCK,8.51,LMT,DAY,CANCELED',
+        ',,10/24/25 09:50:58,STOCK,BUY,+25,TO OPEN,NEUP,,,STOCK,~,MKT,DAY,CANCELED',
+    ])
+
+
+@pytest.fixture(scope='session')
+def patterns_file(tmp_path_factory):
+    """Custom section patterns JSON shared by --section-patterns-file tests."""
+    path = tmp_path_factory.mktemp('patterns') / 'patterns.json'
+    path.write_text(json.dumps({
+        '(?i)custom.*section': 'CustomSection',
+        '(?i)exec.*time.*price.*order.*type': 'Filled Orders',
+    }))
+    return str(path)
+
+
+@dataclass
+class AppStateStub:
+    """Minimal stand-in for tui.AppState; screens only read output_path."""
+    output_path: str = "output.ndjson"
+
+
+@pytest.fixture(scope='session')
+def app_state():
+    """AppState stub shared by TUI tests that only construct screens."""
+    return AppStateStub()
+
+
+@pytest.fixture(scope='module')
+def sample_csv_tree(tmp_path_factory):
+    """Directory holding empty file1.csv and file2.csv, for read-only path checks."""
+    root = tmp_path_factory.mktemp('sample_csvs')
+    for name in ('file1.csv', 'file2.csv'):
+        (root / name).touch()
+    return root
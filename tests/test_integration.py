@@ -1,432 +1,432 @@
 """Integration tests for the CSV to JSON conversion."""
+import io
 import pytest
-import json
-import tempfile
-import os
+import click
 from pathlib import Path
-from click.testing import CliRunner
-from main import main
+from main import convert_stream, main, parse_file
+from tests._ndjson_util import contains_json_kv, load_ndjson, loads
+
+
+# All fields that should be in the unified schema
+_REQUIRED_FIELDS = frozenset((
+    'section', 'row_index', 'raw', 'issues',
+    # Time fields
+    'exec_time', 'time_canceled', 'time_placed',
+    # Trade fields
+    'side', 'qty', 'pos_effect', 'symbol',
+    # Option fields
+    'exp', 'strike', 'type', 'spread',
+    # Price fields
+    'price', 'net_price', 'price_improvement',
+    # Order fields
+    'order_type', 'tif', 'status',
+    # Other fields
+    'notes', 'mark',
+))
+
+
+def _check_ndjson_records(result, output):
+    records = load_ndjson(output)
+    assert len(records) > 0
+    for obj in records:
+        assert 'section' in obj
+        assert 'row_index' in obj
+        assert 'issues' in obj
+
+
+def _check_preview(result, output):
+    assert 'Preview' in result.output
+
+
+def _check_json_array(result, output):
+    assert isinstance(loads(output.read_bytes()), list)
+
+
+def _check_pretty(result, output):
+    # Pretty printed JSON should have newlines and indentation
+    content = output.read_text()
+    assert '\n' in content
+    assert '  ' in content
+
+
+def _check_two_lines(result, output):
+    # --max-rows 2 keeps the column header plus the first data row
+    assert len(load_ndjson(output)) == 2
+
+
+def _check_verbose(result, output):
+    assert 'Row 1:' in result.output
+
+
+def _check_bom_stripped(result, output):
+    # The BOM must not leak into the detected column header
+    records = load_ndjson(output)
+    assert [r['symbol'] for r in records if r['symbol'] == 'TEST'] == ['TEST']
+
+
+# Outputs of the corpus files as written by the converter, compared byte for byte
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+# Shared CSV building blocks, kept as bytes and fed to the converter via BytesIO
+HDR_FILLED = b',,Exec Time,Side,Qty,Symbol,Price\n'
+ROW_FILLED = b',,10/24/25,SELL,100,TEST,10.50\n'
+CSV_FILLED = HDR_FILLED + ROW_FILLED
+
+
+def run_convert(csv_data, **options):
+    """Convert CSV bytes (or text) in memory and return the JSON output text."""
+    source = io.BytesIO(csv_data) if isinstance(csv_data, bytes) else io.StringIO(csv_data)
+    out = io.StringIO()
+    convert_stream(source, out, **options)
+    return out.getvalue()
+
+
+@pytest.fixture
+def csv_fixture(request, csv_corpus):
+    """Corpus CSV path selected indirectly by parametrize."""
+    return csv_corpus[request.param]
 
 
 class TestCLIIntegration:
     """Test the CLI end-to-end."""
 
-    def setup_method(self):
-        self.runner = CliRunner()
-
-    def test_basic_conversion_ndjson(self):
-        """Test basic CSV to NDJSON conversion."""
-        with self.runner.isolated_filesystem():
-            # Create a simple test CSV
-            with open('test_input.csv', 'w') as f:
-                f.write('Today\'s Trade Activity\n')
-                f.write('\n')
-                f.write('Filled Orders\n')
-                f.write(',,Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Price Improvement,Order Type\n')
-                f.write(',,10/24/25 09:51:38,STOCK,SELL,-75,TO CLOSE,NEUP,,,STOCK,8.30,8.30,-,MKT\n')
-
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson'])
-
-            assert result.exit_code == 0
-            assert os.path.exists('output.ndjson')
-
-            # Verify output
-            with open('output.ndjson', 'r') as f:
-                lines = f.readlines()
-                assert len(lines) > 0
-
-                # Parse each line as JSON
-                for line in lines:
-                    obj = json.loads(line)
-                    assert 'section' in obj
-                    assert 'row_index' in obj
-                    assert 'issues' in obj
-
-    def test_conversion_with_preview(self):
-        """Test conversion with preview option."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty\n')
-                f.write(',,10/24/25,SELL,100\n')
-
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson', '--preview', '1'])
-
-            assert result.exit_code == 0
-            assert 'Preview' in result.output
-
-    def test_conversion_to_json_array(self):
-        """Test conversion to JSON array format."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty\n')
-                f.write(',,10/24/25,SELL,100\n')
-
-            result = self.runner.invoke(main, ['test_input.csv', 'output.json', '--output-json'])
-
-            assert result.exit_code == 0
-
-            # Verify it's a valid JSON array
-            with open('output.json', 'r') as f:
-                data = json.load(f)
-                assert isinstance(data, list)
-
-    def test_conversion_with_pretty_print(self):
-        """Test pretty-printed JSON output."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty\n')
-                f.write(',,10/24/25,SELL,100\n')
-
-            result = self.runner.invoke(main, [
-                'test_input.csv', 'output.json',
-                '--output-json', '--pretty'
-            ])
-
-            assert result.exit_code == 0
-
-            with open('output.json', 'r') as f:
-                content = f.read()
-                # Pretty printed JSON should have newlines and indentation
-                assert '\n' in content
-                assert '  ' in content
-
-    def test_conversion_with_max_rows(self):
-        """Test max-rows limit."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty\n')
-                f.write(',,10/24/25,SELL,100\n')
-                f.write(',,10/24/25,BUY,200\n')
-                f.write(',,10/24/25,SELL,300\n')
-
-            result = self.runner.invoke(main, [
-                'test_input.csv', 'output.ndjson',
-                '--max-rows', '2'
-            ])
-
-            assert result.exit_code == 0
-
-            with open('output.ndjson', 'r') as f:
-                lines = f.readlines()
-                # Should only have 2 lines
-                assert len(lines) == 2
-
-    def test_conversion_with_custom_patterns(self):
-        """Test custom section patterns file."""
-        with self.runner.isolated_filesystem():
-            # Create custom patterns file
-            with open('patterns.json', 'w') as f:
-                json.dump({
-                    '(?i)custom.*section': 'CustomSection'
-                }, f)
+    @pytest.mark.parametrize('csv_fixture,output_name,args,check', [
+        pytest.param('filled_three_rows', 'output.ndjson', [], _check_ndjson_records, id='ndjson'),
+        pytest.param('filled_three_rows', 'output.ndjson', ['--preview', '1'], _check_preview, id='preview'),
+        pytest.param('filled_three_rows', 'output.json', ['--output-json'], _check_json_array, id='json-array'),
+        pytest.param('filled_three_rows', 'output.json', ['--output-json', '--pretty'], _check_pretty, id='pretty'),
+        pytest.param('filled_three_rows', 'output.ndjson', ['--max-rows', '2'], _check_two_lines, id='max-rows'),
+        pytest.param('filled_three_rows', 'output.ndjson', ['--verbose'], _check_verbose, id='verbose'),
+        pytest.param('bom_header', 'output.ndjson', ['--encoding', 'utf-8'], _check_bom_stripped, id='encoding'),
+    ], indirect=['csv_fixture'])
+    def test_conversion_options(self, runner, csv_fixture, tmp_path, output_name, args, check):
+        """Test a single-file conversion under each CLI option."""
+        output = tmp_path / output_name
+
+        result = runner.invoke(main, [csv_fixture, str(output), *args])
 
-            with open('test_input.csv', 'w') as f:
-                f.write('Custom Section Header\n')
-                f.write(',,Data1,Data2\n')
+        assert result.exit_code == 0
+        check(result, output)
+
+    @pytest.mark.parametrize('flag,expected_qty', [
+        ('--qty-signed', -100),
+        ('--qty-unsigned', 100),
+    ])
+    def test_qty_sign_option(self, runner, tmp_path, make_csv, flag, expected_qty):
+        """Test signed and unsigned quantity options."""
+        input_csv = make_csv('test_input.csv', [
+            ',,Exec Time,Side,Qty,Symbol',
+            ',,10/24/25,SELL,-100,TEST',
+        ])
+        output = tmp_path / 'output.ndjson'
+
+        result = runner.invoke(main, [input_csv, str(output), flag])
 
-            result = self.runner.invoke(main, [
-                'test_input.csv', 'output.ndjson',
-                '--section-patterns-file', 'patterns.json'
-            ])
+        assert result.exit_code == 0
+        quantities = [obj['qty'] for obj in load_ndjson(output) if obj['qty'] is not None]
+        assert quantities == [expected_qty]
+
+    def test_jobs_option(self, runner, csv_corpus, tmp_path):
+        """Test that --jobs runs a batch in worker processes with the same output."""
+        inputs = [csv_corpus['filled_single'], csv_corpus['filled_three_rows']]
+        sequential = tmp_path / 'sequential.ndjson'
+        parallel = tmp_path / 'parallel.ndjson'
+
+        seq_result = runner.invoke(main, [*inputs, str(sequential)])
+        par_result = runner.invoke(main, [*inputs, str(parallel), '--jobs', '2'])
+
+        assert seq_result.exit_code == 0
+        assert par_result.exit_code == 0
+        assert parallel.read_bytes() == sequential.read_bytes()
+        assert 'Files processed: 2/2' in par_result.output
+
+    def test_jobs_option_rejects_zero(self, runner, csv_corpus, tmp_path):
+        """Test that --jobs must be at least 1."""
+        result = runner.invoke(main, [csv_corpus['filled_single'], str(tmp_path / 'out.ndjson'), '-j', '0'])
+
+        assert result.exit_code != 0
+
+    @pytest.mark.parametrize('csv_fixture,output_name,args,golden', [
+        pytest.param('filled_three_rows', 'output.ndjson', [], 'filled_three_rows.ndjson', id='ndjson'),
+        pytest.param('filled_three_rows', 'output.json', ['--output-json'], 'filled_three_rows.json',
+                     id='json-array'),
+        pytest.param('filled_three_rows', 'output.json', ['--output-json', '--pretty'],
+                     'filled_three_rows.pretty.json', id='pretty'),
+        pytest.param('non_ascii', 'output.ndjson', [], 'non_ascii.ndjson', id='non-ascii'),
+    ], indirect=['csv_fixture'])
+    def test_output_matches_golden_bytes(self, runner, csv_fixture, tmp_path, output_name, args, golden):
+        """Test that output files are byte-for-byte identical to the recorded outputs."""
+        output = tmp_path / output_name
+
+        result = runner.invoke(main, [csv_fixture, str(output), *args])
 
-            assert result.exit_code == 0
+        assert result.exit_code == 0
+        assert output.read_bytes() == (GOLDEN_DIR / golden).read_bytes()
+
+    def test_force_overwrite_input_is_parsed_before_writing(self, runner, tmp_path, csv_corpus_text):
+        """Test that --force-overwrite onto the input converts it instead of truncating it."""
+        path = tmp_path / 'trades.csv'
+        path.write_text(csv_corpus_text['filled_three_rows'])
+
+        result = runner.invoke(main, [str(path), str(path), '--force-overwrite'])
 
-    def test_help_option(self):
-        """Test --help option."""
-        result = self.runner.invoke(main, ['--help'])
         assert result.exit_code == 0
-        assert 'INPUT_CSV' in result.output
-        assert 'OUTPUT_JSON' in result.output
+        assert 'Parsed records: 4' in result.output
+        assert [r['symbol'] for r in load_ndjson(path)] == [None, 'AAA', 'BBB', 'CCC']
 
-    def test_missing_input_file(self):
-        """Test error handling for missing input file."""
-        with self.runner.isolated_filesystem():
-            result = self.runner.invoke(main, ['nonexistent.csv', 'output.ndjson'])
-            assert result.exit_code != 0
-
-    def test_qty_unsigned_option(self):
-        """Test unsigned quantity option."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty,Symbol\n')
-                f.write(',,10/24/25,SELL,-100,TEST\n')
-
-            # Test with signed (default)
-            result = self.runner.invoke(main, [
-                'test_input.csv', 'output_signed.ndjson',
-                '--qty-signed'
-            ])
-            assert result.exit_code == 0
-
-            with open('output_signed.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    if obj.get('qty') is not None:
-                        # Should be negative for signed
-                        assert obj['qty'] <= 0 or obj['qty'] > 0
-                        break
-
-            # Test with unsigned
-            result = self.runner.invoke(main, [
-                'test_input.csv', 'output_unsigned.ndjson',
-                '--qty-unsigned'
-            ])
-            assert result.exit_code == 0
-
-    def test_verbose_logging(self):
-        """Test verbose logging option."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty\n')
-
-            result = self.runner.invoke(main, [
-                'test_input.csv', 'output.ndjson',
-                '--verbose'
-            ])
-
-            assert result.exit_code == 0
+    def test_patterns_error_leaves_no_output_file(self, runner, csv_corpus, tmp_path):
+        """Test that a failed parse doesn't create the output file."""
+        patterns = tmp_path / 'patterns.json'
+        patterns.write_text('{"(?i)[bad": "X"}')
+        output = tmp_path / 'output.ndjson'
 
+        result = runner.invoke(main, [
+            csv_corpus['filled_single'], str(output),
+            '--section-patterns-file', str(patterns)
+        ])
 
-class TestRealWorldScenarios:
-    """Test with real-world-like data."""
+        assert result.exit_code != 0
+        assert not output.exists()
 
-    def setup_method(self):
-        self.runner = CliRunner()
+    def test_conversion_with_custom_patterns(self, runner, patterns_file, tmp_path, make_csv):
+        """Test custom section patterns file."""
+        input_csv = make_csv('test_input.csv', [
+            'Custom Section Header',
+            ',,Data1,Data2',
+        ])
+        output = tmp_path / 'output.ndjson'
 
-    def test_multiple_sections(self):
-        """Test CSV with multiple sections."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write('Working Orders\n')
-                f.write('Notes,,Time Placed,Side,Qty,Symbol\n')
-                f.write(',,10/24/25 08:00:00,BUY,50,WORK\n')  # Added data row
-                f.write('\n')
-                f.write('Filled Orders\n')
-                f.write(',,Exec Time,Spread,Side,Qty,Symbol,Price,Net Price,Order Type\n')
-                f.write(',,10/24/25 09:51:38,STOCK,SELL,-75,NEUP,8.30,8.30,MKT\n')
-                f.write('\n')
-                f.write('Canceled Orders\n')
-                f.write('Notes,,Time Canceled,Side,Qty,Symbol\n')
-                f.write(',,10/24/25 07:00:00,SELL,100,CANCEL\n')  # Added data row
-
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson'])
-
-            assert result.exit_code == 0
-
-            sections_found = set()
-            with open('output.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    sections_found.add(obj['section'])
-
-            # Should have found multiple sections
-            assert len(sections_found) > 1
+        result = runner.invoke(main, [
+            input_csv, str(output),
+            '--section-patterns-file', patterns_file
+        ])
 
-    def test_empty_and_null_fields(self):
-        """Test handling of empty and null fields."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty,Symbol,Price\n')
-                f.write(',,10/24/25,SELL,,-,\n')  # Missing qty and price
-                f.write(',,,,,\n')  # All empty
+        assert result.exit_code == 0
 
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson'])
+    def test_help_option(self):
+        """Test --help option."""
+        help_text = main.get_help(click.Context(main))
+        assert 'INPUT_CSV' in help_text
+        assert 'OUTPUT_JSON' in help_text
 
-            assert result.exit_code == 0
+    def test_missing_input_file(self, tmp_path):
+        """Test error handling for missing input file."""
+        with pytest.raises(SystemExit) as excinfo:
+            main.main(
+                [str(tmp_path / 'nonexistent.csv'), str(tmp_path / 'output.ndjson')],
+                standalone_mode=False,
+            )
+        assert excinfo.value.code != 0
+
+
+def _check_stream_ndjson(records, text):
+    lines = text.splitlines()
+    assert len(lines) == len(records) > 0
+    for line in lines:
+        obj = loads(line)
+        assert 'section' in obj
+        assert 'row_index' in obj
+        assert 'issues' in obj
+
+
+def _check_stream_json_array(records, text):
+    data = loads(text)
+    assert isinstance(data, list)
+    assert [r['row_index'] for r in data] == [r['row_index'] for r in records]
+
+
+def _check_stream_pretty(records, text):
+    # Pretty printed JSON should have newlines and indentation
+    assert '\n' in text
+    assert '  ' in text
+    assert len(loads(text)) == len(records)
+
+
+def _check_stream_max_rows(records, text):
+    # max_rows=2 keeps the column header plus the first data row
+    assert text.count('\n') == 2
+
+
+class TestConvertStream:
+    """Test the in-process conversion API without the Click layer."""
+
+    @pytest.mark.parametrize('options,check', [
+        pytest.param({}, _check_stream_ndjson, id='ndjson'),
+        pytest.param({'output_json': True}, _check_stream_json_array, id='json-array'),
+        pytest.param({'output_json': True, 'pretty': True}, _check_stream_pretty, id='pretty'),
+        pytest.param({'max_rows': 2}, _check_stream_max_rows, id='max-rows'),
+    ])
+    def test_conversion_options(self, csv_corpus_text, options, check):
+        """Test converting an in-memory CSV under each output option."""
+        out = io.StringIO()
+
+        records, _ = convert_stream(io.StringIO(csv_corpus_text['filled_three_rows']), out, **options)
+
+        check(records, out.getvalue())
+
+    @pytest.mark.parametrize('qty_unsigned,expected_qty', [
+        (False, -100),
+        (True, 100),
+    ])
+    def test_qty_sign_option(self, qty_unsigned, expected_qty):
+        """Test signed and unsigned quantity parsing."""
+        content = run_convert(
+            HDR_FILLED + b',,10/24/25,SELL,-100,TEST,10.50\n',
+            qty_unsigned=qty_unsigned,
+        )
+
+        quantities = [
+            obj['qty'] for obj in map(loads, content.splitlines())
+            if obj['qty'] is not None
+        ]
+        assert quantities == [expected_qty]
 
-            with open('output.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    # Should have issues tracking or null values
-                    assert 'issues' in obj
+    def test_binary_input_stream(self, csv_corpus_text):
+        """Binary input is decoded as UTF-8, like a file opened by path."""
+        out = io.StringIO()
+        data = csv_corpus_text['filled_single'].encode('utf-8')
 
-    def test_price_improvement_parsing(self):
-        """Test parsing of price improvement field."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty,Symbol,Price,Price Improvement\n')
-                f.write(',,10/24/25,BUY,100,TEST,10.50,$0.25\n')
-                f.write(',,10/24/25,SELL,50,TEST,11.00,-\n')
+        records, _ = convert_stream(io.BytesIO(data), out)
 
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson'])
+        assert [r['symbol'] for r in records if r['symbol']] == ['TEST']
 
-            assert result.exit_code == 0
+    def test_leading_bom_dropped_from_raw(self, csv_corpus):
+        """A BOM at the start of the file doesn't end up in the header record."""
+        records, _ = parse_file(csv_corpus['bom_header'])
 
-            with open('output.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    if 'price_improvement' in obj and obj['price_improvement'] is not None:
-                        assert isinstance(obj['price_improvement'], (int, float))
+        assert records[0]['raw'] == ',,Exec Time,Side,Qty,Symbol,Price'
 
-    def test_unicode_handling(self):
-        """Test handling of unicode characters."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w', encoding='utf-8') as f:
-                f.write('\ufeff,,Exec Time,Side,Qty,Symbol\n')  # BOM
-                f.write(',,10/24/25,SELL,100,TEST\n')
 
-            result = self.runner.invoke(main, [
-                'test_input.csv', 'output.ndjson',
-                '--encoding', 'utf-8'
-            ])
+class TestRealWorldScenarios:
+    """Test with real-world-like data."""
 
-            assert result.exit_code == 0
+    def test_multiple_sections(self, runner, multi_section_csv, tmp_path):
+        """Test CSV with multiple sections."""
+        output = tmp_path / 'output.ndjson'
 
-    def test_section_header_detection(self):
-        """Test that sections are properly identified."""
-        with self.runner.isolated_filesystem():
-            # Create a custom patterns file in the isolated filesystem
-            with open('patterns.json', 'w') as f:
-                json.dump({
-                    '(?i)exec.*time.*price.*order.*type': 'Filled Orders'
-                }, f)
+        result = runner.invoke(main, [str(multi_section_csv), str(output)])
+
+        assert result.exit_code == 0
+
+        # Should have found multiple sections
+        for section in ('Working Orders', 'Filled Orders', 'Canceled Orders'):
+            assert contains_json_kv(output, 'section', section)
+
+    def test_empty_and_null_fields(self):
+        """Test handling of empty and null fields."""
+        content = run_convert(
+            HDR_FILLED
+            + b',,10/24/25,SELL,,-,\n'  # Missing qty and price
+            + b',,,,,\n'  # All empty
+        )
 
-            with open('test_input.csv', 'w') as f:
-                # Write a recognizable section header
-                f.write(',Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Price Improvement,Order Type\n')
-                f.write(',,10/24/25,STOCK,SELL,-75,TO CLOSE,NEUP,,,STOCK,8.30,8.30,-,MKT\n')
+        for line in content.splitlines():
+            # Should have issues tracking or null values
+            assert 'issues' in loads(line)
 
-            result = self.runner.invoke(main, [
-                'test_input.csv', 'output.ndjson',
-                '--section-patterns-file', 'patterns.json'
-            ])
+    def test_price_improvement_parsing(self):
+        """Test parsing of price improvement field."""
+        content = run_convert(
+            b',,Exec Time,Side,Qty,Symbol,Price,Price Improvement\n'
+            b',,10/24/25,BUY,100,TEST,10.50,$0.25\n'
+            b',,10/24/25,SELL,50,TEST,11.00,-\n'
+        )
 
-            assert result.exit_code == 0
+        for obj in map(loads, content.splitlines()):
+            if 'price_improvement' in obj and obj['price_improvement'] is not None:
+                assert isinstance(obj['price_improvement'], (int, float))
 
-            # Check that we got output with section information
-            sections_found = set()
-            with open('output.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    if 'section' in obj:
-                        sections_found.add(obj['section'])
+    def test_section_header_detection(self, runner, patterns_file, tmp_path, make_csv):
+        """Test that sections are properly identified."""
+        input_csv = make_csv('test_input.csv', [
+            # Write a recognizable section header
+            ',Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Price Improvement,Order Type',
+            ',,10/24/25,STOCK,SELL,-75,TO CLOSE,NEUP,,,STOCK,8.30,8.30,-,MKT',
+        ])
+        output = tmp_path / 'output.ndjson'
+
+        result = runner.invoke(main, [
+            input_csv, str(output),
+            '--section-patterns-file', patterns_file
+        ])
 
-            # Should have identified at least one section
-            assert len(sections_found) > 0
+        assert result.exit_code == 0
+
+        # The column header row should be identified as Filled Orders
+        assert contains_json_kv(output, 'section', 'Filled Orders')
 
 
 class TestOutputFormat:
     """Test output format and structure."""
 
-    def setup_method(self):
-        self.runner = CliRunner()
-
     def test_output_has_required_fields(self):
         """Test that output has all required fields from unified schema."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty,Symbol,Price\n')
-                f.write(',,10/24/25,SELL,100,TEST,10.50\n')
-
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson'])
-
-            assert result.exit_code == 0
-
-            # All fields that should be in the unified schema
-            required_fields = [
-                'section', 'row_index', 'raw', 'issues',
-                # Time fields
-                'exec_time', 'time_canceled', 'time_placed',
-                # Trade fields
-                'side', 'qty', 'pos_effect', 'symbol',
-                # Option fields
-                'exp', 'strike', 'type', 'spread',
-                # Price fields
-                'price', 'net_price', 'price_improvement',
-                # Order fields
-                'order_type', 'tif', 'status',
-                # Other fields
-                'notes', 'mark'
-            ]
-            with open('output.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    for field in required_fields:
-                        assert field in obj, f"Field '{field}' missing from output"
+        content = run_convert(CSV_FILLED)
+
+        records = [loads(line) for line in content.splitlines()]
+        assert records
+        missing = {
+            r.get('row_index'): sorted(_REQUIRED_FIELDS - r.keys())
+            for r in records if not _REQUIRED_FIELDS <= r.keys()
+        }
+        assert not missing, f"Fields missing from output by row: {missing}"
 
     def test_raw_field_preserves_original(self):
         """Test that raw field preserves original CSV row."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty\n')
-                f.write(',,10/24/25,SELL,100\n')
-
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson'])
+        content = run_convert(CSV_FILLED)
 
-            assert result.exit_code == 0
-
-            with open('output.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    assert 'raw' in obj
-                    assert isinstance(obj['raw'], str)
+        obj = loads(content.split('\n', 1)[0])
+        assert isinstance(obj['raw'], str)
+        assert obj['raw'] == HDR_FILLED.decode().rstrip('\n')  # the header row, verbatim
 
     def test_issues_array_structure(self):
         """Test that issues array is properly structured."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write(',,Exec Time,Side,Qty,Price\n')
-                f.write(',,10/24/25,SELL,invalid_qty,abc\n')  # Invalid data
+        content = run_convert(
+            HDR_FILLED + b',,10/24/25,SELL,invalid_qty,TEST,abc\n'  # Invalid data
+        )
 
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson'])
+        for obj in map(loads, content.splitlines()):
+            assert 'issues' in obj
+            assert isinstance(obj['issues'], list)
 
-            assert result.exit_code == 0
+    def test_canceled_orders_section_mapping(self, runner, canceled_orders_csv, tmp_path):
+        """Test that Canceled Orders section is properly mapped to unified schema."""
+        output = tmp_path / 'output.ndjson'
 
-            with open('output.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    assert 'issues' in obj
-                    assert isinstance(obj['issues'], list)
+        result = runner.invoke(main, [str(canceled_orders_csv), str(output)])
 
-    def test_canceled_orders_section_mapping(self):
-        """Test that Canceled Orders section is properly mapped to unified schema."""
-        with self.runner.isolated_filesystem():
-            with open('test_input.csv', 'w') as f:
-                f.write('Canceled Orders\n')
-                f.write('Notes,,Time Canceled,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,PRICE,,TIF,Status\n')
-                f.write(',,10/24/25 09:51:36,STOCK,SELL,-75,TO CLOSE,NEUP,,,STOCK,8.51,LMT,DAY,CANCELED\n')
-                f.write(',,10/24/25 09:50:58,STOCK,BUY,+25,TO OPEN,NEUP,,,STOCK,~,MKT,DAY,CANCELED\n')
-
-            result = self.runner.invoke(main, ['test_input.csv', 'output.ndjson'])
-
-            assert result.exit_code == 0
-
-            # Verify canceled orders data
-            records = []
-            with open('output.ndjson', 'r') as f:
-                for line in f:
-                    obj = json.loads(line)
-                    if obj.get('section') == 'Canceled Orders' and 'section_header' not in obj.get('issues', []):
-                        records.append(obj)
-
-            # Should have 2 data records
-            assert len(records) >= 2
-
-            # Check first canceled order
-            rec1 = records[0]
-            assert rec1['section'] == 'Canceled Orders'
-            assert rec1['time_canceled'] == '2025-10-24T09:51:36'  # ISO format
-            assert rec1['side'] == 'SELL'
-            assert rec1['qty'] == -75
-            assert rec1['symbol'] == 'NEUP'
-            assert rec1['price'] == 8.51
-            assert rec1['tif'] == 'DAY'
-            assert rec1['status'] == 'CANCELED'
-            # These should be null for canceled orders
-            assert rec1['net_price'] is None
-            assert rec1['price_improvement'] is None
-
-            # Check second canceled order (with ~ for price)
-            rec2 = records[1]
-            assert rec2['price'] is None  # ~ should be treated as null
+        assert result.exit_code == 0
+
+        # Verify canceled orders data
+        records = [
+            obj for obj in load_ndjson(output)
+            if obj.get('section') == 'Canceled Orders' and 'section_header' not in obj.get('issues', [])
+        ]
 
+        # Should have 2 data records
+        assert len(records) >= 2
 
-class TestAccountStatementIntegration:
-    """Integration tests for account statement CSV parsing."""
+        # Check first canceled order
+        rec1 = records[0]
+        assert rec1['section'] == 'Canceled Orders'
+        assert rec1['time_canceled'] == '2025-10-24T09:51:36'  # ISO format
+        assert rec1['side'] == 'SELL'
+        assert rec1['qty'] == -75
+        assert rec1['symbol'] == 'NEUP'
+        assert rec1['price'] == 8.51
+        assert rec1['tif'] == 'DAY'
+        assert rec1['status'] == 'CANCELED'
+        # These should be null for canceled orders
+        assert rec1['net_price'] is None
+        assert rec1['price_improvement'] is None
+
+        # Check second canceled order (with ~ for price)
+        rec2 = records[1]
+        assert rec2['price'] is None  # ~ should be treated as null
 
-    def test_parse_account_statement_file(self, tmp_path):
-        """Parse complete account statement file with both sections."""
-        csv_content = """Account Statement for 79967586
+
+ACCOUNT_STATEMENT_CSV = b"""Account Statement for 79967586
 
 Account Order History
 Notes,,Time Placed,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,PRICE,,TIF,Status
@@ -439,21 +439,64 @@ Account Trade History
 ,12/2/25 09:42:26,STOCK,SELL,-200,TO CLOSE,JSPR,,,STOCK,2.17,2.17,STP
 ,12/2/25 09:35:41,STOCK,BUY,+200,TO OPEN,JSPR,,,STOCK,2.2995,2.2995,LMT
 """
-        test_file = tmp_path / "test_statement.csv"
-        test_file.write_text(csv_content)
 
-        from main import parse_file
-        records, sections_skipped = parse_file(str(test_file), skip_empty_sections=True)
+TRADE_HISTORY_CSV = b"""Account Trade History
+,Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Order Type
+,12/2/25 09:35:41,STOCK,BUY,+200,TO OPEN,JSPR,,,STOCK,2.30,2.30,LMT
+"""
+
+TRADE_ACTIVITY_CSV = b"""Today's Trade Activity
 
-        # Verify section normalization
-        sections = {r['section'] for r in records if r.get('section')}
+Filled Orders
+,,Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Price Improvement,Order Type
+,,10/24/25 09:51:38,STOCK,SELL,-75,TO CLOSE,NEUP,,,STOCK,8.30,8.30,-,MKT
+,,10/24/25 09:43:44,STOCK,BUY,+100,TO OPEN,NEUP,,,STOCK,7.2163,7.2163,2.37,MKT
+"""
+
+
+def _parse_csv_text(tmp_path_factory, name, content, **kwargs):
+    """Write bytes content to a fresh temp file and return parse_file's records."""
+    csv_file = tmp_path_factory.mktemp('statements') / name
+    csv_file.write_bytes(content)
+    records, _ = parse_file(str(csv_file), **kwargs)
+    return records
+
+
+@pytest.fixture(scope='module')
+def account_statement_records(tmp_path_factory):
+    """Records from a full account statement, parsed once per module."""
+    return _parse_csv_text(
+        tmp_path_factory, 'test_statement.csv', ACCOUNT_STATEMENT_CSV,
+        skip_empty_sections=True,
+    )
+
+
+@pytest.fixture(scope='module')
+def trade_history_records(tmp_path_factory):
+    """Records from an Account Trade History-only file, parsed once per module."""
+    return _parse_csv_text(tmp_path_factory, 'trade_history.csv', TRADE_HISTORY_CSV)
+
+
+@pytest.fixture(scope='module')
+def trade_activity_records(tmp_path_factory):
+    """Records from a Today's Trade Activity file, parsed once per module."""
+    return _parse_csv_text(tmp_path_factory, 'trade_activity.csv', TRADE_ACTIVITY_CSV)
+
+
+class TestAccountStatementIntegration:
+    """Integration tests for account statement CSV parsing."""
+
+    def test_account_statement_sections_normalized(self, account_statement_records):
+        """Account Trade History is reported as Filled Orders."""
+        sections = {r['section'] for r in account_statement_records if r.get('section')}
         assert 'Account Order History' in sections
         assert 'Filled Orders' in sections  # Account Trade History normalized
         assert 'Account Trade History' not in sections
 
-        # Verify data correctness
+    def test_account_statement_trade_history_data(self, account_statement_records):
+        """Trade history rows parse into correctly typed Filled Orders records."""
         trade_history_records = [
-            r for r in records
+            r for r in account_statement_records
             if r.get('section') == 'Filled Orders'
             and r.get('exec_time') is not None
             and 'section_header' not in r.get('issues', [])
@@ -465,42 +508,22 @@ Account Trade History
         assert jspr_buy['qty'] == 200
         assert jspr_buy['price'] == 2.2995
 
-    def test_account_statement_missing_price_improvement(self, tmp_path):
+    def test_account_statement_missing_price_improvement(self, trade_history_records):
         """Account Trade History records should have null price_improvement."""
-        csv_content = """Account Trade History
-,Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Order Type
-,12/2/25 09:35:41,STOCK,BUY,+200,TO OPEN,JSPR,,,STOCK,2.30,2.30,LMT
-"""
-        tmp_file = tmp_path / "trade_history.csv"
-        tmp_file.write_text(csv_content)
-
-        from main import parse_file
-        records, _ = parse_file(str(tmp_file))
-
-        data_records = [r for r in records if 'section_header' not in r.get('issues', [])]
+        data_records = [
+            r for r in trade_history_records if 'section_header' not in r.get('issues', [])
+        ]
         assert len(data_records) == 1
         assert data_records[0]['price_improvement'] is None
         assert data_records[0]['section'] == 'Filled Orders'
 
-    def test_backward_compatibility_trade_activity_unchanged(self, tmp_path):
-        """Existing trade activity files should parse identically."""
-        csv_content = """Today's Trade Activity
-
-Filled Orders
-,,Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Price Improvement,Order Type
-,,10/24/25 09:51:38,STOCK,SELL,-75,TO CLOSE,NEUP,,,STOCK,8.30,8.30,-,MKT
-,,10/24/25 09:43:44,STOCK,BUY,+100,TO OPEN,NEUP,,,STOCK,7.2163,7.2163,2.37,MKT
-"""
-        test_file = tmp_path / "trade_activity.csv"
-        test_file.write_text(csv_content)
-
-        from main import parse_file
-        records, _ = parse_file(str(test_file))
-
-        sections = {r['section'] for r in records}
+    def test_backward_compatibility_trade_activity_sections(self, trade_activity_records):
+        """Existing trade activity files keep their Filled Orders section name."""
+        sections = {r['section'] for r in trade_activity_records}
         assert 'Filled Orders' in sections
         assert 'Account Trade History' not in sections
 
-        # Verify price_improvement preserved
-        filled = [r for r in records if r.get('price_improvement') == 2.37]
+    def test_backward_compatibility_trade_activity_price_improvement(self, trade_activity_records):
+        """Existing trade activity files keep their price_improvement values."""
+        filled = [r for r in trade_activity_records if r.get('price_improvement') == 2.37]
         assert len(filled) == 1
@@ -1,8 +1,13 @@
 """Unit tests for main.py conversion functions."""
+import json
+import os
 import pytest
 import re
+from collections.abc import Mapping
+from types import MappingProxyType
 from main import (
     compile_section_patterns,
+    load_section_patterns,
     normalize_key,
     normalize_section_name,
     map_header_to_index,
@@ -10,8 +15,19 @@ from main import (
     detect_section_from_row,
     parse_integer_qty,
     parse_float_field,
+    build_section_header_record,
+    build_union_pattern,
+    match_section_row,
+    build_order_record,
+    prepare_record_builder,
+    classify_row,
+    expand_glob_patterns,
+    write_json_array,
+    write_ndjson,
     COL_ALIASES,
-    DEFAULT_SECTION_PATTERNS
+    DEFAULT_COMPILED_PATTERNS,
+    DEFAULT_SECTION_PATTERNS,
+    DEFAULT_UNION_PATTERN,
 )
 
 
@@ -30,6 +46,13 @@ class TestCompileSectionPatterns:
         result = compile_section_patterns({})
         assert result == []
 
+    def test_compile_returns_fresh_list_in_pattern_order(self):
+        patterns = {'(?i)b': 'B', '(?i)a': 'A'}
+        first = compile_section_patterns(patterns)
+        first.clear()
+        result = compile_section_patterns(patterns)
+        assert [name for _, name in result] == ['B', 'A']
+
     def test_compile_multiple_patterns(self):
         patterns = {
             '(?i)filled': 'Filled',
@@ -39,6 +62,29 @@ class TestCompileSectionPatterns:
         assert len(result) == 2
 
 
+class TestLoadSectionPatterns:
+    """Test loading custom section patterns files."""
+
+    def test_load_returns_pattern_dict(self, patterns_file):
+        result = load_section_patterns(patterns_file)
+        assert result['(?i)custom.*section'] == 'CustomSection'
+
+    def test_load_returns_fresh_dict(self, patterns_file):
+        first = load_section_patterns(patterns_file)
+        first['(?i)extra'] = 'Extra'
+        assert '(?i)extra' not in load_section_patterns(patterns_file)
+
+    def test_load_picks_up_file_changes(self, tmp_path):
+        path = tmp_path / 'patterns.json'
+        path.write_text(json.dumps({'(?i)one': 'One'}))
+        assert load_section_patterns(path) == {'(?i)one': 'One'}
+
+        path.write_text(json.dumps({'(?i)two': 'Two'}))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert load_section_patterns(path) == {'(?i)two': 'Two'}
+
+
 class TestNormalizeKey:
     """Test key normalization function."""
 
@@ -81,6 +127,17 @@ class TestMapHeaderToIndex:
         result = map_header_to_index([])
         assert result == {}
 
+    def test_map_returns_fresh_dict(self):
+        header = ['Exec Time', 'Side', 'Qty']
+        first = map_header_to_index(header)
+        first['side'] = 99
+        assert map_header_to_index(header)['side'] == 1
+
+    def test_map_with_custom_aliases_bypasses_default_mapping(self):
+        header = ['Exec Time', 'Fill']
+        result = map_header_to_index(header, {'fill': 'price'})
+        assert result == {'price': 1}
+
     def test_map_with_none_values(self):
         header = [None, 'Side', '', 'Qty']
         result = map_header_to_index(header)
@@ -147,303 +204,257 @@ class TestMapHeaderToIndex:
 class TestSafeGet:
     """Test safe row access function."""
 
-    def test_safe_get_valid_index(self):
-        row = ['value1', 'value2', 'value3']
-        assert safe_get(row, 1) == 'value2'
-
-    def test_safe_get_none_index(self):
-        row = ['value1', 'value2']
-        assert safe_get(row, None) is None
-
-    def test_safe_get_negative_index(self):
-        row = ['value1', 'value2']
-        assert safe_get(row, -1) is None
-
-    def test_safe_get_out_of_bounds(self):
-        row = ['value1', 'value2']
-        assert safe_get(row, 5) is None
-
-    def test_safe_get_empty_string(self):
-        row = ['value1', '', 'value3']
-        assert safe_get(row, 1) is None
-
-    def test_safe_get_whitespace_only(self):
-        row = ['value1', '   ', 'value3']
-        assert safe_get(row, 1) is None
-
-    def test_safe_get_strips_whitespace(self):
-        row = ['  value1  ', 'value2']
-        assert safe_get(row, 0) == 'value1'
-
-    def test_safe_get_tilde_as_null(self):
-        """Test that '~' is treated as null (per PRD)."""
-        row = ['value1', '~', 'value3']
-        assert safe_get(row, 1) is None
-
-    def test_safe_get_dash_as_null(self):
-        """Test that '-' is treated as null (per PRD)."""
-        row = ['value1', '-', 'value3']
-        assert safe_get(row, 1) is None
-
-    def test_safe_get_tilde_with_whitespace(self):
-        """Test that '~' with whitespace is treated as null."""
-        row = ['value1', '  ~  ', 'value3']
-        assert safe_get(row, 1) is None
-
-    def test_safe_get_dash_with_whitespace(self):
-        """Test that '-' with whitespace is treated as null."""
-        row = ['value1', '  -  ', 'value3']
-        assert safe_get(row, 1) is None
+    @pytest.mark.parametrize('row,index,expected', [
+        pytest.param(['value1', 'value2', 'value3'], 1, 'value2', id='valid-index'),
+        pytest.param(['value1', 'value2'], None, None, id='none-index'),
+        pytest.param(['value1', 'value2'], -1, None, id='negative-index'),
+        pytest.param(['value1', 'value2'], 5, None, id='out-of-bounds'),
+        pytest.param(['value1', '', 'value3'], 1, None, id='empty-string'),
+        pytest.param(['value1', '   ', 'value3'], 1, None, id='whitespace-only'),
+        pytest.param(['  value1  ', 'value2'], 0, 'value1', id='strips-whitespace'),
+        # '~' and '-' are null markers (per PRD), with or without padding
+        pytest.param(['value1', '~', 'value3'], 1, None, id='tilde-as-null'),
+        pytest.param(['value1', '-', 'value3'], 1, None, id='dash-as-null'),
+        pytest.param(['value1', '  ~  ', 'value3'], 1, None, id='tilde-with-whitespace'),
+        pytest.param(['value1', '  -  ', 'value3'], 1, None, id='dash-with-whitespace'),
+    ])
+    def test_safe_get(self, row, index, expected):
+        assert safe_get(row, index) == expected
+
+
+@pytest.fixture(scope='module')
+def default_compiled_patterns():
+    """DEFAULT_SECTION_PATTERNS compiled once per module."""
+    return DEFAULT_COMPILED_PATTERNS
+
+
+@pytest.fixture(scope='module')
+def compiled_test_patterns():
+    """Custom patterns that are easier to match, compiled once per module."""
+    return compile_section_patterns({
+        r'(?i)exec\s*time.*price.*order\s*type': 'Filled Orders',
+        r'(?i)working\s*orders': 'Working Orders',
+        r'(?i)canceled.*orders': 'Canceled Orders'
+    })
 
 
 class TestDetectSectionFromRow:
     """Test section detection from CSV rows."""
 
-    def setup_method(self):
-        # Use custom patterns for testing that are easier to match
-        self.test_patterns = {
-            r'(?i)exec\s*time.*price.*order\s*type': 'Filled Orders',
-            r'(?i)working\s*orders': 'Working Orders',
-            r'(?i)canceled.*orders': 'Canceled Orders'
-        }
-        self.compiled_patterns = compile_section_patterns(self.test_patterns)
-
-    def test_detect_filled_orders_section(self):
+    def test_detect_filled_orders_section(self, compiled_test_patterns):
         # Test with data that matches pattern
         row = ['Exec Time', 'Spread', 'Side', 'Qty', 'Price', 'Order Type']
-        result = detect_section_from_row(row, self.compiled_patterns)
+        result = detect_section_from_row(row, compiled_test_patterns)
         assert result == 'Filled Orders'
 
-    def test_detect_working_orders_section(self):
+    def test_detect_working_orders_section(self, compiled_test_patterns):
         row = ['Working Orders']
-        result = detect_section_from_row(row, self.compiled_patterns)
+        result = detect_section_from_row(row, compiled_test_patterns)
         assert result == 'Working Orders'
 
-    def test_detect_no_section(self):
+    def test_detect_no_section(self, compiled_test_patterns):
         row = ['10/24/25 09:51:38', 'STOCK', 'SELL', '-75']
-        result = detect_section_from_row(row, self.compiled_patterns)
+        result = detect_section_from_row(row, compiled_test_patterns)
         assert result is None
 
-    def test_detect_with_none_values(self):
+    def test_detect_with_none_values(self, compiled_test_patterns):
         row = [None, 'Exec Time', 'Spread', 'Price', 'Order Type']
-        result = detect_section_from_row(row, self.compiled_patterns)
+        result = detect_section_from_row(row, compiled_test_patterns)
         assert result == 'Filled Orders'
 
-    def test_detect_empty_row(self):
-        result = detect_section_from_row([], self.compiled_patterns)
+    def test_detect_empty_row(self, compiled_test_patterns):
+        result = detect_section_from_row([], compiled_test_patterns)
         assert result is None
 
-    def test_detect_case_insensitive(self):
+    def test_detect_case_insensitive(self, compiled_test_patterns):
         row = ['WORKING ORDERS']
-        result = detect_section_from_row(row, self.compiled_patterns)
+        result = detect_section_from_row(row, compiled_test_patterns)
         assert result == 'Working Orders'
 
-    def test_detect_with_default_patterns(self):
+    def test_detect_with_default_patterns(self, default_compiled_patterns):
         """Test that DEFAULT_SECTION_PATTERNS is usable."""
-        default_compiled = compile_section_patterns(DEFAULT_SECTION_PATTERNS)
-        # Should be able to compile without errors
-        assert len(default_compiled) > 0
+        assert len(default_compiled_patterns) > 0
+        row = ['Filled Orders']
+        assert detect_section_from_row(row, default_compiled_patterns) == 'Filled Orders'
+
+
+class TestBuildUnionPattern:
+    """Test the single-regex section matcher against the per-pattern scan."""
+
+    @pytest.mark.parametrize('row', [
+        ['Filled Orders'],
+        ['', '', 'Exec Time', 'Spread', 'Side', 'Qty', 'Pos Effect', 'Symbol', 'Exp', 'Strike',
+         'Type', 'Price', 'Net Price', 'Price Improvement', 'Order Type'],
+        ['Cash Balance'],
+        ['Account Summary'],
+        ['Symbol', 'Description', 'Qty'],
+        ['Unknown Section'],
+        ['', '', '10/24/25 09:51:38', 'STOCK', 'SELL'],
+        [],
+    ])
+    def test_union_matches_per_pattern_scan(self, row, default_compiled_patterns):
+        union = build_union_pattern(DEFAULT_SECTION_PATTERNS)
+        assert union is not None
+        assert (match_section_row(row, default_compiled_patterns, union)
+                == match_section_row(row, default_compiled_patterns))
+
+    def test_first_pattern_wins(self):
+        patterns = {r'(?i)orders': 'First', r'(?i)^filled': 'Second'}
+        union = build_union_pattern(patterns)
+        compiled = compile_section_patterns(patterns)
+        # 'filled' matches earlier in the row, but the first pattern still wins
+        assert detect_section_from_row(['Filled Orders'], compiled, union) == 'First'
+
+    def test_patterns_with_groups_map_to_correct_section(self):
+        patterns = {r'(a)(b)c': 'ABC', r'(?i)^filled': 'Filled'}
+        union = build_union_pattern(patterns)
+        compiled = compile_section_patterns(patterns)
+        assert detect_section_from_row(['Filled'], compiled, union) == 'Filled'
+        assert detect_section_from_row(['xabc'], compiled, union) == 'ABC'
+
+    def test_backreference_patterns_are_not_combined(self):
+        assert build_union_pattern({r'(a)\1': 'Double'}) is None
+        assert build_union_pattern({r'(?P<x>a)': 'Named'}) is None
+
+    def test_empty_patterns(self):
+        assert build_union_pattern({}) is None
+
+    def test_anchored_patterns_prefilter_by_prefix(self):
+        patterns = {r'(?i)^Filled Orders?\s*$': 'Filled', r'(?i)^Working': 'Working'}
+        union = build_union_pattern(patterns)
+        compiled = compile_section_patterns(patterns)
+        # A quantified last character is left out of the literal prefix
+        assert union[2] == ('filled order', 'working')
+        assert detect_section_from_row(['FILLED ORDER'], compiled, union) == 'Filled'
+        assert detect_section_from_row(['Other'], compiled, union) is None
+
+    def test_unanchored_pattern_disables_prefilter(self):
+        assert build_union_pattern({r'(?i)^Filled': 'F', r'(?i)orders': 'O'})[2] is None
+
+    @pytest.mark.parametrize('pattern,row', [
+        (r'^2025 Summary', ['2025 Summary']),
+        (r'^#Notes', ['#Notes', '']),
+        (r'^\d+ Orders', ['12 Orders']),
+        (r'(?i)^\$ amounts', ['$ Amounts']),
+        (r'(?i)total', ['', '123', 'Total']),
+    ])
+    def test_custom_patterns_match_rows_not_led_by_a_letter(self, pattern, row):
+        patterns = {pattern: 'Custom'}
+        compiled = compile_section_patterns(patterns)
+        assert detect_section_from_row(row, compiled) == 'Custom'
+        assert detect_section_from_row(row, compiled, build_union_pattern(patterns)) == 'Custom'
+
+    def test_ignore_pattern_is_distinguished_from_no_match(self, default_compiled_patterns):
+        union = build_union_pattern(DEFAULT_SECTION_PATTERNS)
+        assert match_section_row(['Cash Balance'], default_compiled_patterns, union) == (True, None)
+        assert match_section_row(['Unknown'], default_compiled_patterns, union) == (False, None)
 
 
 class TestParseIntegerQty:
     """Test quantity parsing function."""
 
-    def test_parse_positive_integer(self):
-        issues = []
-        result = parse_integer_qty('100', issues)
-        assert result == 100
-        assert issues == []
-
-    def test_parse_negative_integer(self):
-        issues = []
-        result = parse_integer_qty('-50', issues)
-        assert result == -50
-        assert issues == []
-
-    def test_parse_with_plus_sign(self):
-        issues = []
-        result = parse_integer_qty('+75', issues)
-        assert result == 75
-        assert issues == []
-
-    def test_parse_with_comma(self):
-        issues = []
-        result = parse_integer_qty('1,000', issues)
-        assert result == 1000
-        assert issues == []
-
-    def test_parse_none(self):
-        issues = []
-        result = parse_integer_qty(None, issues)
-        assert result is None
-        assert issues == []
-
-    def test_parse_empty_string(self):
-        issues = []
-        result = parse_integer_qty('', issues)
-        assert result is None
-        assert issues == []
-
-    def test_parse_whitespace(self):
-        issues = []
-        result = parse_integer_qty('  ', issues)
-        assert result is None
-        assert issues == []
-
-    def test_parse_invalid_format(self):
-        issues = []
-        result = parse_integer_qty('abc', issues)
-        assert result == 'abc'  # Returns raw value on failure
-        assert 'qty_parse_failed' in issues
-
-    def test_parse_negative_with_plus_sign(self):
-        issues = []
-        result = parse_integer_qty('-+50', issues)
-        assert result == -50
-        assert issues == []
-
-    def test_parse_preserves_negative_sign(self):
+    @pytest.mark.parametrize('value,expected,expected_issues', [
+        pytest.param('100', 100, [], id='positive-integer'),
+        pytest.param('-50', -50, [], id='negative-integer'),
+        pytest.param('+75', 75, [], id='plus-sign'),
+        pytest.param('1,000', 1000, [], id='comma'),
+        pytest.param(None, None, [], id='none'),
+        pytest.param('', None, [], id='empty-string'),
+        pytest.param('  ', None, [], id='whitespace'),
+        # Returns raw value on failure
+        pytest.param('abc', 'abc', ['qty_parse_failed'], id='invalid-format'),
+        pytest.param('-+50', -50, [], id='negative-with-plus-sign'),
+        pytest.param('+-50', -50, [], id='plus-with-negative-sign'),
+        pytest.param('-123', -123, [], id='preserves-negative-sign'),
+    ])
+    def test_parse_integer_qty(self, value, expected, expected_issues):
         issues = []
-        result = parse_integer_qty('-123', issues)
-        assert result == -123
-        assert issues == []
+        assert parse_integer_qty(value, issues) == expected
+        assert issues == expected_issues
 
 
 class TestParseFloatField:
     """Test float field parsing function."""
 
-    def test_parse_basic_float(self):
-        issues = []
-        result = parse_float_field('10.50', 'price', issues)
-        assert result == 10.50
-        assert issues == []
-
-    def test_parse_with_dollar_sign(self):
-        issues = []
-        result = parse_float_field('$10.50', 'price', issues)
-        assert result == 10.50
-        assert issues == []
-
-    def test_parse_with_comma(self):
-        issues = []
-        result = parse_float_field('1,234.56', 'price', issues)
-        assert result == 1234.56
-        assert issues == []
-
-    def test_parse_none(self):
-        issues = []
-        result = parse_float_field(None, 'price', issues)
-        assert result is None
-        assert issues == []
-
-    def test_parse_integer_string(self):
+    @pytest.mark.parametrize('value,field,expected,expected_issues', [
+        pytest.param('10.50', 'price', 10.50, [], id='basic-float'),
+        pytest.param('$10.50', 'price', 10.50, [], id='dollar-sign'),
+        pytest.param('1,234.56', 'price', 1234.56, [], id='comma'),
+        pytest.param(None, 'price', None, [], id='none'),
+        pytest.param('100', 'price', 100.0, [], id='integer-string'),
+        pytest.param('abc', 'price', None, ['price_parse_failed'], id='invalid-format'),
+        pytest.param('$$10.50', 'price', 10.50, [], id='multiple-dollar-signs'),
+        pytest.param('invalid', 'net_price', None, ['net_price_parse_failed'],
+                     id='tracks-field-name-in-issues'),
+        pytest.param('-10.50', 'price', -10.50, [], id='negative-float'),
+        pytest.param('1.5e2', 'price', 150.0, [], id='scientific-notation'),
+    ])
+    def test_parse_float_field(self, value, field, expected, expected_issues):
         issues = []
-        result = parse_float_field('100', 'price', issues)
-        assert result == 100.0
-        assert issues == []
+        assert parse_float_field(value, field, issues) == expected
+        assert issues == expected_issues
 
-    def test_parse_invalid_format(self):
-        issues = []
-        result = parse_float_field('abc', 'price', issues)
-        assert result is None
-        assert 'price_parse_failed' in issues
 
-    def test_parse_multiple_dollar_signs(self):
-        issues = []
-        result = parse_float_field('$$10.50', 'price', issues)
-        assert result == 10.50
-        assert issues == []
+class TestBuildSectionHeaderRecord:
+    """Test section/column header record construction."""
 
-    def test_parse_tracks_field_name_in_issues(self):
-        issues = []
-        parse_float_field('invalid', 'net_price', issues)
-        assert 'net_price_parse_failed' in issues
+    def test_header_record_fields(self):
+        rec = build_section_header_record('Filled Orders', ['', '', 'Exec Time', 'Side'], 3)
+        assert rec['section'] == 'Filled Orders'
+        assert rec['row_index'] == 3
+        assert rec['raw'] == ',,Exec Time,Side'
+        assert rec['issues'] == ['section_header']
+        assert rec['exec_time'] is None
+        assert rec['mark'] is None
+        assert list(rec)[:4] == ['section', 'row_index', 'raw', 'issues']
 
-    def test_parse_negative_float(self):
-        issues = []
-        result = parse_float_field('-10.50', 'price', issues)
-        assert result == -10.50
-        assert issues == []
-
-    def test_parse_scientific_notation(self):
-        issues = []
-        result = parse_float_field('1.5e2', 'price', issues)
-        assert result == 150.0
-        assert issues == []
+    def test_header_records_are_independent(self):
+        first = build_section_header_record('Filled Orders', ['Filled Orders'], 1)
+        second = build_section_header_record('Filled Orders', ['Filled Orders'], 2)
+        first['issues'].append('extra')
+        first['symbol'] = 'SPY'
+        assert second['issues'] == ['section_header']
+        assert second['symbol'] is None
 
 
 class TestColAliases:
     """Test that COL_ALIASES mapping is properly defined."""
 
     def test_aliases_exist(self):
-        assert isinstance(COL_ALIASES, dict)
+        assert isinstance(COL_ALIASES, Mapping)
         assert len(COL_ALIASES) > 0
 
-    def test_exec_time_aliases(self):
-        assert 'exec time' in COL_ALIASES
-        assert COL_ALIASES['exec time'] == 'exec_time'
-
-    def test_qty_aliases(self):
-        assert 'qty' in COL_ALIASES
-        assert 'quantity' in COL_ALIASES
-        assert COL_ALIASES['qty'] == 'qty'
-        assert COL_ALIASES['quantity'] == 'qty'
+    def test_aliases_are_read_only(self):
+        with pytest.raises(TypeError):
+            COL_ALIASES['new header'] = 'qty'
+
+    def test_alias_keys_are_normalized(self):
+        assert all(normalize_key(alias) == alias for alias in COL_ALIASES)
+
+    @pytest.mark.parametrize('alias,expected', [
+        ('exec time', 'exec_time'),
+        ('qty', 'qty'),
+        ('quantity', 'qty'),
+        ('time canceled', 'time_canceled'),
+        ('time placed', 'time_placed'),
+        ('notes', 'notes'),
+        ('spread', 'spread'),
+        ('exp', 'exp'),
+        ('strike', 'strike'),
+        ('type', 'type'),
+        ('tif', 'tif'),
+        ('status', 'status'),
+        ('mark', 'mark'),
+    ])
+    def test_col_alias(self, alias, expected):
+        """Each CSV header alias maps to its canonical field name."""
+        assert COL_ALIASES[alias] == expected
 
     def test_price_aliases(self):
         assert 'price' in COL_ALIASES
         assert 'net price' in COL_ALIASES
         assert 'price improvement' in COL_ALIASES
 
-    def test_time_canceled_alias(self):
-        """Test that Time Canceled maps to time_canceled field."""
-        assert 'time canceled' in COL_ALIASES
-        assert COL_ALIASES['time canceled'] == 'time_canceled'
-
-    def test_time_placed_alias(self):
-        """Test that Time Placed maps to time_placed field."""
-        assert 'time placed' in COL_ALIASES
-        assert COL_ALIASES['time placed'] == 'time_placed'
-
-    def test_notes_alias(self):
-        """Test that Notes maps to notes field."""
-        assert 'notes' in COL_ALIASES
-        assert COL_ALIASES['notes'] == 'notes'
-
-    def test_spread_alias(self):
-        """Test that Spread maps to spread field."""
-        assert 'spread' in COL_ALIASES
-        assert COL_ALIASES['spread'] == 'spread'
-
-    def test_exp_alias(self):
-        """Test that Exp maps to exp field."""
-        assert 'exp' in COL_ALIASES
-        assert COL_ALIASES['exp'] == 'exp'
-
-    def test_strike_alias(self):
-        """Test that Strike maps to strike field."""
-        assert 'strike' in COL_ALIASES
-        assert COL_ALIASES['strike'] == 'strike'
-
-    def test_type_alias(self):
-        """Test that Type maps to type field."""
-        assert 'type' in COL_ALIASES
-        assert COL_ALIASES['type'] == 'type'
-
-    def test_tif_alias(self):
-        """Test that TIF maps to tif field."""
-        assert 'tif' in COL_ALIASES
-        assert COL_ALIASES['tif'] == 'tif'
-
-    def test_status_alias(self):
-        """Test that Status maps to status field."""
-        assert 'status' in COL_ALIASES
-        assert COL_ALIASES['status'] == 'status'
-
-    def test_mark_alias(self):
-        """Test that Mark maps to mark field."""
-        assert 'mark' in COL_ALIASES
-        assert COL_ALIASES['mark'] == 'mark'
-
 
 class TestDefaultSectionPatterns:
     """Test that DEFAULT_SECTION_PATTERNS is properly defined."""
@@ -453,18 +464,18 @@ class TestDefaultSectionPatterns:
         assert len(DEFAULT_SECTION_PATTERNS) > 0
 
     def test_filled_orders_pattern_exists(self):
-        patterns_str = '\n'.join(DEFAULT_SECTION_PATTERNS.keys())
-        assert 'exec' in patterns_str.lower()
-        # Filter out None values (ignored sections) before joining
-        section_names = [v for v in DEFAULT_SECTION_PATTERNS.values() if v is not None]
-        assert 'filled' in '\n'.join(section_names).lower()
+        assert any('exec' in k.lower() for k in DEFAULT_SECTION_PATTERNS)
+        # None values mark ignored sections
+        assert any(v and 'filled' in v.lower() for v in DEFAULT_SECTION_PATTERNS.values())
 
     def test_all_patterns_are_valid_regex(self):
-        for pattern in DEFAULT_SECTION_PATTERNS.keys():
-            try:
-                re.compile(pattern)
-            except re.error:
-                pytest.fail(f"Invalid regex pattern: {pattern}")
+        # DEFAULT_COMPILED_PATTERNS is built at import, so an invalid pattern fails collection
+        assert len(DEFAULT_COMPILED_PATTERNS) == len(DEFAULT_SECTION_PATTERNS)
+        assert all(isinstance(p, re.Pattern) for p, _ in DEFAULT_COMPILED_PATTERNS)
+
+    def test_compiled_defaults_match_compile_section_patterns(self):
+        assert list(DEFAULT_COMPILED_PATTERNS) == compile_section_patterns(DEFAULT_SECTION_PATTERNS)
+        assert DEFAULT_UNION_PATTERN is not None
 
 
 class TestEdgeCases:
@@ -494,29 +505,32 @@ class TestEdgeCases:
 class TestAccountStatementSectionDetection:
     """Test detection of account statement section headers."""
 
-    def test_detect_account_trade_history_header(self):
+    def test_detect_account_trade_history_header(self, default_compiled_patterns):
         """Detect Account Trade History section from full header row."""
-        row = ',Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Order Type'
-        cells = row.split(',')
-        patterns = compile_section_patterns(DEFAULT_SECTION_PATTERNS)
-        result = detect_section_from_row(cells, patterns)
+        cells = [
+            '', 'Exec Time', 'Spread', 'Side', 'Qty', 'Pos Effect', 'Symbol', 'Exp', 'Strike',
+            'Type', 'Price', 'Net Price', 'Order Type',
+        ]
+        result = detect_section_from_row(cells, default_compiled_patterns)
         assert result == 'Account Trade History'
 
-    def test_detect_account_order_history_header(self):
+    def test_detect_account_order_history_header(self, default_compiled_patterns):
         """Detect Account Order History section from full header row."""
-        row = 'Notes,,Time Placed,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,PRICE,,TIF,Status'
-        cells = row.split(',')
-        patterns = compile_section_patterns(DEFAULT_SECTION_PATTERNS)
-        result = detect_section_from_row(cells, patterns)
+        cells = [
+            'Notes', '', 'Time Placed', 'Spread', 'Side', 'Qty', 'Pos Effect', 'Symbol', 'Exp',
+            'Strike', 'Type', 'PRICE', '', 'TIF', 'Status',
+        ]
+        result = detect_section_from_row(cells, default_compiled_patterns)
         assert result == 'Account Order History'
 
-    def test_account_statement_patterns_dont_conflict_with_trade_activity(self):
+    def test_account_statement_patterns_dont_conflict_with_trade_activity(self, default_compiled_patterns):
         """Ensure new patterns don't match existing trade activity headers."""
         # Test that Filled Orders pattern still matches (has Price Improvement column)
-        filled_row = ',,Exec Time,Spread,Side,Qty,Pos Effect,Symbol,Exp,Strike,Type,Price,Net Price,Price Improvement,Order Type'
-        cells = filled_row.split(',')
-        patterns = compile_section_patterns(DEFAULT_SECTION_PATTERNS)
-        result = detect_section_from_row(cells, patterns)
+        cells = [
+            '', '', 'Exec Time', 'Spread', 'Side', 'Qty', 'Pos Effect', 'Symbol', 'Exp',
+            'Strike', 'Type', 'Price', 'Net Price', 'Price Improvement', 'Order Type',
+        ]
+        result = detect_section_from_row(cells, default_compiled_patterns)
         assert result == 'Filled Orders'
 
 
@@ -525,146 +539,130 @@ class TestSectionNameNormalization:
 
     def test_normalize_section_name_account_trade_history(self):
         """Account Trade History should normalize to Filled Orders."""
-        from main import normalize_section_name
         result = normalize_section_name('Account Trade History')
         assert result == 'Filled Orders'
 
     def test_normalize_section_name_account_order_history(self):
         """Account Order History should remain unchanged."""
-        from main import normalize_section_name
         result = normalize_section_name('Account Order History')
         assert result == 'Account Order History'
 
     def test_normalize_section_name_passthrough(self):
         """Existing section names should remain unchanged."""
-        from main import normalize_section_name
         assert normalize_section_name('Filled Orders') == 'Filled Orders'
         assert normalize_section_name('Canceled Orders') == 'Canceled Orders'
         assert normalize_section_name('Working Orders') == 'Working Orders'
 
     def test_normalize_section_name_case_insensitive(self):
         """Normalization should be case-insensitive."""
-        from main import normalize_section_name
         assert normalize_section_name('account trade history') == 'Filled Orders'
         assert normalize_section_name('ACCOUNT TRADE HISTORY') == 'Filled Orders'
 
     def test_normalize_section_name_none(self):
         """None should pass through as None."""
-        from main import normalize_section_name
         assert normalize_section_name(None) is None
 
 
+@pytest.fixture(scope='class')
+def order_history_header_map():
+    """Read-only header map for an Account Order History row."""
+    return MappingProxyType({
+        'time_placed': 2, 'side': 4, 'qty': 5,
+        'symbol': 7, 'type': 10, 'status': 14
+    })
+
+
+@pytest.fixture(scope='class')
+def status_header_map():
+    """Read-only compact header map including a status column."""
+    return MappingProxyType({
+        'side': 2, 'qty': 3, 'symbol': 4, 'type': 5, 'status': 6
+    })
+
+
+@pytest.fixture(scope='class')
+def section_only_header_map():
+    """Read-only compact header map without a status column."""
+    return MappingProxyType({
+        'side': 2, 'qty': 3, 'symbol': 4, 'type': 5
+    })
+
+
 class TestStatusFiltering:
     """Test filtering of TRIGGERED and REJECTED status rows."""
 
-    def test_filter_triggered_status(self):
+    def test_filter_triggered_status(self, order_history_header_map):
         """TRIGGERED status rows should be filtered out by default."""
-        from main import build_order_record
-
         section = 'Account Order History'
-        header_map = {
-            'time_placed': 2, 'side': 4, 'qty': 5,
-            'symbol': 7, 'type': 10, 'status': 14
-        }
         cells = ['', '', '1/15/26 15:17:27', 'SINGLE', 'BUY', '100%',
                  'TO CLOSE', 'SPY', '15 JAN 26', '693', 'PUT', '~',
                  'MKT', 'DAY', 'TRIGGERED']
 
-        result = build_order_record(section, header_map, cells, 1,
+        result = build_order_record(section, order_history_header_map, cells, 1,
                                     filter_triggered_rejected=True)
 
         assert result is None  # Row should be filtered out
 
-    def test_filter_rejected_status(self):
+    def test_filter_rejected_status(self, order_history_header_map):
         """REJECTED status rows should be filtered out by default."""
-        from main import build_order_record
-
         section = 'Account Order History'
-        header_map = {
-            'time_placed': 2, 'side': 4, 'qty': 5,
-            'symbol': 7, 'type': 10, 'status': 14
-        }
         cells = ['', '', '12/3/25 09:50:44', 'STOCK', 'SELL', '-80',
                  'TO CLOSE', 'IRBT', '', '', 'STOCK', '~',
                  'MKT', 'DAY', 'REJECTED']
 
-        result = build_order_record(section, header_map, cells, 1,
+        result = build_order_record(section, order_history_header_map, cells, 1,
                                     filter_triggered_rejected=True)
 
         assert result is None
 
-    def test_filter_rejected_with_message(self):
+    def test_filter_rejected_with_message(self, order_history_header_map):
         """REJECTED: with detailed message should be filtered out."""
-        from main import build_order_record
-
         section = 'Account Order History'
-        header_map = {
-            'time_placed': 2, 'side': 4, 'qty': 5,
-            'symbol': 7, 'type': 10, 'status': 14
-        }
         cells = ['', '', '12/3/25 09:50:44', 'STOCK', 'SELL', '-80',
                  'TO CLOSE', 'IRBT', '', '', 'STOCK', '~',
                  'MKT', 'DAY',
                  'REJECTED: Your buying power will be below zero...']
 
-        result = build_order_record(section, header_map, cells, 1,
+        result = build_order_record(section, order_history_header_map, cells, 1,
                                     filter_triggered_rejected=True)
 
         assert result is None
 
-    def test_include_triggered_when_filter_disabled(self):
+    def test_include_triggered_when_filter_disabled(self, order_history_header_map):
         """TRIGGERED rows should be included when filtering is disabled."""
-        from main import build_order_record
-
         section = 'Account Order History'
-        header_map = {
-            'time_placed': 2, 'side': 4, 'qty': 5,
-            'symbol': 7, 'type': 10, 'status': 14
-        }
         cells = ['', '', '1/15/26 15:17:27', 'SINGLE', 'BUY', '+1',
                  'TO CLOSE', 'SPY', '15 JAN 26', '693', 'PUT', '~',
                  'MKT', 'DAY', 'TRIGGERED']
 
-        result = build_order_record(section, header_map, cells, 1,
+        result = build_order_record(section, order_history_header_map, cells, 1,
                                     filter_triggered_rejected=False)
 
         assert result is not None
         assert result['status'] == 'TRIGGERED'
 
-    def test_normal_status_not_filtered(self):
+    def test_normal_status_not_filtered(self, order_history_header_map):
         """CANCELED and FILLED status should not be filtered."""
-        from main import build_order_record
-
         section = 'Account Order History'
-        header_map = {
-            'time_placed': 2, 'side': 4, 'qty': 5,
-            'symbol': 7, 'type': 10, 'status': 14
-        }
         cells = ['', '', '1/15/26 15:16:07', 'SINGLE', 'SELL', '-2',
                  'TO OPEN', 'SPY', '15 JAN 26', '693', 'PUT', '~',
                  'MKT', 'DAY', 'CANCELED']
 
-        result = build_order_record(section, header_map, cells, 1,
+        result = build_order_record(section, order_history_header_map, cells, 1,
                                     filter_triggered_rejected=True)
 
         assert result is not None
         assert result['status'] == 'CANCELED'
 
-    def test_filter_defaults_to_true(self):
+    def test_filter_defaults_to_true(self, order_history_header_map):
         """Default behavior should filter TRIGGERED/REJECTED rows."""
-        from main import build_order_record
-
         section = 'Account Order History'
-        header_map = {
-            'time_placed': 2, 'side': 4, 'qty': 5,
-            'symbol': 7, 'type': 10, 'status': 14
-        }
         cells = ['', '', '1/15/26 15:17:27', 'SINGLE', 'BUY', '+1',
                  'TO CLOSE', 'SPY', '15 JAN 26', '693', 'PUT', '~',
                  'MKT', 'DAY', 'TRIGGERED']
 
         # Call without filter_triggered_rejected parameter (should default to True)
-        result = build_order_record(section, header_map, cells, 1)
+        result = build_order_record(section, order_history_header_map, cells, 1)
 
         assert result is None  # Should be filtered by default
 
@@ -672,233 +670,319 @@ class TestStatusFiltering:
 class TestStatusToEventTypeMapping:
     """Test that status field is properly mapped to event_type."""
 
-    def test_status_filled_maps_to_fill(self):
+    def test_status_filled_maps_to_fill(self, status_header_map):
         """FILLED status should map to 'fill' event_type."""
-        from main import build_order_record
-
         # Account Order History section with FILLED status
         section = 'Account Order History'
-        header_map = {
-            'side': 2, 'qty': 3, 'symbol': 4, 'type': 5, 'status': 6
-        }
         cells = ['', '', 'BUY', '100', 'AAPL', 'STOCK', 'FILLED']
 
-        result = build_order_record(section, header_map, cells, 1, qty_unsigned=False)
+        result = build_order_record(section, status_header_map, cells, 1, qty_unsigned=False)
 
         assert result is not None
         assert result['status'] == 'FILLED'
         assert result['event_type'] == 'fill'
 
-    def test_status_canceled_maps_to_cancel(self):
+    def test_status_canceled_maps_to_cancel(self, status_header_map):
         """CANCELED status should map to 'cancel' event_type."""
-        from main import build_order_record
-
         # Account Order History section with CANCELED status
         section = 'Account Order History'
-        header_map = {
-            'side': 2, 'qty': 3, 'symbol': 4, 'type': 5, 'status': 6
-        }
         cells = ['', '', 'BUY', '100', 'AAPL', 'STOCK', 'CANCELED']
 
-        result = build_order_record(section, header_map, cells, 1, qty_unsigned=False)
+        result = build_order_record(section, status_header_map, cells, 1, qty_unsigned=False)
 
         assert result is not None
         assert result['status'] == 'CANCELED'
         assert result['event_type'] == 'cancel'
 
-    def test_status_rejected_maps_to_cancel(self):
+    def test_status_rejected_maps_to_cancel(self, status_header_map):
         """REJECTED status should map to 'cancel' event_type."""
-        from main import build_order_record
-
         # Account Order History section with REJECTED status
         section = 'Account Order History'
-        header_map = {
-            'side': 2, 'qty': 3, 'symbol': 4, 'type': 5, 'status': 6
-        }
         cells = ['', '', 'BUY', '100', 'AAPL', 'STOCK', 'REJECTED']
 
         # Disable filtering to test event_type mapping
-        result = build_order_record(section, header_map, cells, 1, qty_unsigned=False,
+        result = build_order_record(section, status_header_map, cells, 1, qty_unsigned=False,
                                     filter_triggered_rejected=False)
 
         assert result is not None
         assert result['status'] == 'REJECTED'
         assert result['event_type'] == 'cancel'
 
-    def test_status_rejected_with_message_maps_to_cancel(self):
+    def test_status_rejected_with_message_maps_to_cancel(self, status_header_map):
         """REJECTED status with detailed message should map to 'cancel' event_type."""
-        from main import build_order_record
-
         # Account Order History section with detailed REJECTED status message
         section = 'Account Order History'
-        header_map = {
-            'side': 2, 'qty': 3, 'symbol': 4, 'type': 5, 'status': 6
-        }
         cells = ['', '', 'BUY', '100', 'AAPL', 'STOCK',
                  'REJECTED: THIS ORDER MAY RESULT IN AN OVERSOLD/OVERBOUGHT POSITION...']
 
         # Disable filtering to test event_type mapping
-        result = build_order_record(section, header_map, cells, 1, qty_unsigned=False,
+        result = build_order_record(section, status_header_map, cells, 1, qty_unsigned=False,
                                     filter_triggered_rejected=False)
 
         assert result is not None
         assert result['status'].startswith('REJECTED:')
         assert result['event_type'] == 'cancel'
 
-    def test_filled_orders_section_still_uses_section_name(self):
+    def test_filled_orders_section_still_uses_section_name(self, section_only_header_map):
         """Filled Orders section should still use section-based event_type."""
-        from main import build_order_record
-
         # Regular Filled Orders section (no status field)
         section = 'Filled Orders'
-        header_map = {
-            'side': 2, 'qty': 3, 'symbol': 4, 'type': 5
-        }
         cells = ['', '', 'BUY', '100', 'AAPL', 'STOCK']
 
-        result = build_order_record(section, header_map, cells, 1, qty_unsigned=False)
+        result = build_order_record(section, section_only_header_map, cells, 1, qty_unsigned=False)
 
         assert result is not None
         assert result['event_type'] == 'fill'
 
-    def test_canceled_orders_section_still_uses_section_name(self):
+    def test_canceled_orders_section_still_uses_section_name(self, section_only_header_map):
         """Canceled Orders section should still use section-based event_type."""
-        from main import build_order_record
-
         # Regular Canceled Orders section (may have status field but section determines type)
         section = 'Canceled Orders'
-        header_map = {
-            'side': 2, 'qty': 3, 'symbol': 4, 'type': 5
-        }
         cells = ['', '', 'BUY', '100', 'AAPL', 'STOCK']
 
-        result = build_order_record(section, header_map, cells, 1, qty_unsigned=False)
+        result = build_order_record(section, section_only_header_map, cells, 1, qty_unsigned=False)
 
         assert result is not None
         assert result['event_type'] == 'cancel'
 
 
+@pytest.fixture(scope='class')
+def filled_header_map():
+    """Read-only header map for a compact Filled Orders row."""
+    return MappingProxyType({
+        'exec_time': 2, 'spread': 3, 'side': 4, 'qty': 5, 'symbol': 6, 'price': 7
+    })
+
+
+class TestPrepareRecordBuilder:
+    """Test the per-header order record builder."""
+
+    ROWS = [
+        ['', '', '10/24/25 09:51:38', 'STOCK', 'SELL', '-75', 'NEUP', '8.30'],
+        ['', '', '10/24/25 09:52:00', 'STOCK', 'BUY', '+25', 'ABC', '1.25'],
+        ['', '', '', '', '', '', '', ''],
+    ]
+
+    def test_builder_matches_build_order_record(self, filled_header_map):
+        build = prepare_record_builder('Filled Orders', filled_header_map, qty_unsigned=True)
+        for row_index, cells in enumerate(self.ROWS, start=1):
+            expected = build_order_record('Filled Orders', filled_header_map, cells, row_index, qty_unsigned=True)
+            assert build(cells, row_index) == expected
+
+    def test_builder_handles_rows_shorter_than_header(self, filled_header_map):
+        build = prepare_record_builder('Filled Orders', filled_header_map)
+        record = build(['', '', '10/24/25 09:51:38', 'STOCK', 'SELL', '-75'], 1)
+        assert record['qty'] == -75
+        assert record['symbol'] is None
+        assert record['price'] is None
+
+    def test_builder_issues_are_per_record(self, filled_header_map):
+        build = prepare_record_builder('Filled Orders', filled_header_map)
+        bad_qty = build(['', '', '10/24/25', 'STOCK', 'SELL', 'abc', 'X', '1.0'], 1)
+        bad_price = build(['', '', '10/24/25', 'STOCK', 'SELL', '10', 'X', 'abc'], 2)
+        clean = build(self.ROWS[0], 3)
+
+        assert bad_qty['issues'] == ['qty_parse_failed']
+        assert bad_price['issues'] == ['price_parse_failed']
+        assert clean['issues'] == []
+        assert clean['issues'] is not bad_qty['issues']
+
+    def test_builder_resolves_section_event_type(self, filled_header_map):
+        build = prepare_record_builder('Canceled Orders', filled_header_map)
+        assert build(self.ROWS[0], 1)['event_type'] == 'cancel'
+        assert build(self.ROWS[2], 3) is None
+
+
+GLOB_TREE_FILES = (
+    'file1.csv', 'file2.csv', 'file3.csv', 'file10.csv',
+    'trade1.csv', 'trade2.csv', 'other.csv', 'manual.csv', '.hidden.csv',
+)
+
+
+@pytest.fixture(scope='session')
+def glob_tree(tmp_path_factory):
+    """Directory of empty CSV files shared by the read-only glob tests."""
+    root = tmp_path_factory.mktemp('glob')
+    for name in GLOB_TREE_FILES:
+        (root / name).touch()
+    return root
+
+
 class TestExpandGlobPatterns:
     """Test glob pattern expansion for input files."""
 
-    def test_expand_literal_filenames(self, tmp_path):
+    def test_expand_literal_filenames(self, glob_tree):
         """Literal filenames should pass through unchanged."""
-        from main import expand_glob_patterns
-
-        # Create test files
-        file1 = tmp_path / "file1.csv"
-        file2 = tmp_path / "file2.csv"
-        file1.touch()
-        file2.touch()
+        file1 = glob_tree / "file1.csv"
+        file2 = glob_tree / "file2.csv"
 
         patterns = [str(file1), str(file2)]
         result = expand_glob_patterns(patterns)
 
-        assert len(result) == 2
-        assert str(file1) in result
-        assert str(file2) in result
+        assert result == [str(file1), str(file2)]
 
-    def test_expand_glob_pattern_star(self, tmp_path):
+    def test_expand_glob_pattern_star(self, glob_tree):
         """Glob pattern with * should expand to matching files."""
-        from main import expand_glob_patterns
-
-        # Create test files
-        (tmp_path / "trade1.csv").touch()
-        (tmp_path / "trade2.csv").touch()
-        (tmp_path / "other.csv").touch()
-
-        pattern = str(tmp_path / "trade*.csv")
+        pattern = str(glob_tree / "trade*.csv")
         result = expand_glob_patterns([pattern])
 
-        assert len(result) == 2
-        assert str(tmp_path / "trade1.csv") in result
-        assert str(tmp_path / "trade2.csv") in result
-        assert str(tmp_path / "other.csv") not in result
+        assert result == [str(glob_tree / "trade1.csv"), str(glob_tree / "trade2.csv")]
+        assert str(glob_tree / "other.csv") not in result
 
-    def test_expand_glob_pattern_question_mark(self, tmp_path):
+    def test_expand_glob_pattern_question_mark(self, glob_tree):
         """Glob pattern with ? should match single character."""
-        from main import expand_glob_patterns
-
-        # Create test files
-        (tmp_path / "file1.csv").touch()
-        (tmp_path / "file2.csv").touch()
-        (tmp_path / "file10.csv").touch()
-
-        pattern = str(tmp_path / "file?.csv")
+        pattern = str(glob_tree / "file?.csv")
         result = expand_glob_patterns([pattern])
 
-        assert len(result) == 2
-        assert str(tmp_path / "file1.csv") in result
-        assert str(tmp_path / "file2.csv") in result
-        assert str(tmp_path / "file10.csv") not in result
+        assert result == [str(glob_tree / f"file{i}.csv") for i in (1, 2, 3)]
+        assert str(glob_tree / "file10.csv") not in result
 
-    def test_expand_glob_pattern_brackets(self, tmp_path):
+    def test_expand_glob_pattern_brackets(self, glob_tree):
         """Glob pattern with [] should match character ranges."""
-        from main import expand_glob_patterns
-
-        # Create test files
-        (tmp_path / "file1.csv").touch()
-        (tmp_path / "file2.csv").touch()
-        (tmp_path / "file3.csv").touch()
-
-        pattern = str(tmp_path / "file[12].csv")
+        pattern = str(glob_tree / "file[12].csv")
         result = expand_glob_patterns([pattern])
 
-        assert len(result) == 2
-        assert str(tmp_path / "file1.csv") in result
-        assert str(tmp_path / "file2.csv") in result
-        assert str(tmp_path / "file3.csv") not in result
+        assert result == [str(glob_tree / "file1.csv"), str(glob_tree / "file2.csv")]
+        assert str(glob_tree / "file3.csv") not in result
 
-    def test_expand_mixed_patterns_and_literals(self, tmp_path):
+    def test_expand_mixed_patterns_and_literals(self, glob_tree):
         """Mix of glob patterns and literal filenames should work."""
-        from main import expand_glob_patterns
-
-        # Create test files
-        (tmp_path / "trade1.csv").touch()
-        (tmp_path / "trade2.csv").touch()
-        (tmp_path / "manual.csv").touch()
-
         patterns = [
-            str(tmp_path / "trade*.csv"),
-            str(tmp_path / "manual.csv")
+            str(glob_tree / "trade*.csv"),
+            str(glob_tree / "manual.csv")
         ]
         result = expand_glob_patterns(patterns)
 
-        assert len(result) == 3
-        assert str(tmp_path / "trade1.csv") in result
-        assert str(tmp_path / "trade2.csv") in result
-        assert str(tmp_path / "manual.csv") in result
+        assert result == [
+            str(glob_tree / "trade1.csv"),
+            str(glob_tree / "trade2.csv"),
+            str(glob_tree / "manual.csv"),
+        ]
 
-    def test_expand_no_matches_returns_original(self, tmp_path):
+    def test_expand_no_matches_returns_original(self, glob_tree):
         """If glob pattern matches nothing, return original pattern."""
-        from main import expand_glob_patterns
-
-        pattern = str(tmp_path / "nonexistent*.csv")
+        pattern = str(glob_tree / "nonexistent*.csv")
         result = expand_glob_patterns([pattern])
 
         # Should return the original pattern (validation will catch non-existent files later)
-        assert len(result) == 1
-        assert result[0] == pattern
+        assert result == [pattern]
+
+    def test_expand_skips_hidden_files_like_glob(self, glob_tree):
+        """Wildcards only match dotfiles when the pattern starts with a dot."""
+        assert str(glob_tree / ".hidden.csv") not in expand_glob_patterns([str(glob_tree / "*.csv")])
+        assert expand_glob_patterns([str(glob_tree / ".*.csv")]) == [str(glob_tree / ".hidden.csv")]
+
+    def test_expand_scans_each_directory_once(self, glob_tree, monkeypatch):
+        """Patterns sharing a directory reuse one listing within a call."""
+        calls = []
+        real_scandir = os.scandir
+
+        def counting_scandir(path):
+            calls.append(path)
+            return real_scandir(path)
+
+        monkeypatch.setattr(os, 'scandir', counting_scandir)
+        result = expand_glob_patterns([str(glob_tree / "trade*.csv"), str(glob_tree / "file?.csv")])
+
+        assert len(result) == 5
+        assert calls == [str(glob_tree)]
+
+    def test_expand_patterns_across_directories(self, tmp_path):
+        """Patterns in different directories each expand against their own listing."""
+        for account in ('acct1', 'acct2', 'acct3'):
+            (tmp_path / account).mkdir()
+            (tmp_path / account / f"{account}_trades.csv").touch()
+
+        patterns = [str(tmp_path / account / "*.csv") for account in ('acct3', 'acct1', 'acct2')]
+        result = expand_glob_patterns(patterns + [str(tmp_path / "missing" / "*.csv")])
+
+        assert result == [
+            str(tmp_path / "acct3" / "acct3_trades.csv"),
+            str(tmp_path / "acct1" / "acct1_trades.csv"),
+            str(tmp_path / "acct2" / "acct2_trades.csv"),
+            str(tmp_path / "missing" / "*.csv"),
+        ]
 
     def test_expand_empty_list(self):
         """Empty input should return empty list."""
-        from main import expand_glob_patterns
-
         result = expand_glob_patterns([])
         assert result == []
 
-    def test_expand_preserves_order(self, tmp_path):
+    def test_expand_preserves_order(self, glob_tree):
         """Results should be sorted for consistency."""
-        from main import expand_glob_patterns
-
-        # Create test files
-        (tmp_path / "file3.csv").touch()
-        (tmp_path / "file1.csv").touch()
-        (tmp_path / "file2.csv").touch()
-
-        pattern = str(tmp_path / "file*.csv")
+        pattern = str(glob_tree / "file*.csv")
         result = expand_glob_patterns([pattern])
 
-        # glob.glob returns sorted results by default in Python 3.5+
-        assert len(result) == 3
+        assert len(result) == 4
         assert result == sorted(result)
+
+
+class TestWriteOutput:
+    """Test NDJSON and JSON array writers."""
+
+    def test_write_ndjson_utf8_lines(self, tmp_path):
+        output = tmp_path / "out.ndjson"
+        records = [{'symbol': 'SPY', 'notes': 'café'}, {'symbol': 'QQQ', 'notes': None}]
+        write_ndjson(records, str(output))
+
+        raw = output.read_bytes()
+        assert raw == '{"symbol": "SPY", "notes": "café"}\n{"symbol": "QQQ", "notes": null}\n'.encode('utf-8')
+
+    def test_write_json_array_compact_and_pretty(self, tmp_path):
+        records = [{'symbol': 'SPY', 'qty': -10}]
+        compact = tmp_path / "compact.json"
+        pretty = tmp_path / "pretty.json"
+        write_json_array(records, str(compact))
+        write_json_array(records, str(pretty), pretty=True)
+
+        assert compact.read_text(encoding='utf-8') == json.dumps(records, ensure_ascii=False)
+        assert pretty.read_text(encoding='utf-8') == json.dumps(records, ensure_ascii=False, indent=2)
+
+
+class TestRecordIssues:
+    """Test the issues value attached to parsed order records."""
+
+    HEADER_MAP = {'side': 4, 'qty': 5, 'symbol': 7, 'type': 10, 'price': 11}
+
+    def test_clean_record_has_own_empty_list(self):
+        cells = ['', '', '', 'STOCK', 'BUY', '100', 'TO OPEN', 'SPY', '', '', 'STOCK', '10.50']
+        first = build_order_record('Filled Orders', self.HEADER_MAP, cells, 1)
+        second = build_order_record('Filled Orders', self.HEADER_MAP, cells, 2)
+
+        assert first['issues'] == []
+        # Callers may append to a record's issues without affecting other records
+        first['issues'].append('checked')
+        assert second['issues'] == []
+
+    def test_record_with_parse_failures_keeps_list(self):
+        cells = ['', '', '', 'STOCK', 'BUY', 'abc', 'TO OPEN', 'SPY', '', '', 'STOCK', 'bad']
+        rec = build_order_record('Filled Orders', self.HEADER_MAP, cells, 1)
+
+        assert rec['issues'] == ['qty_parse_failed', 'price_parse_failed']
+
+
+class TestClassifyRow:
+    """Test row classification."""
+
+    def test_filled_orders_header(self):
+        cells = ['', '', 'Exec Time', 'Spread', 'Side', 'Qty', 'Pos Effect', 'Symbol']
+        assert classify_row(cells) == 'header'
+
+    def test_account_order_history_header(self):
+        cells = ['Notes', '', 'Time Placed', 'Spread', 'Side', 'Qty', 'Symbol', 'Status']
+        assert classify_row(cells) == 'header'
+
+    def test_suffixed_column_names_are_header(self):
+        assert classify_row(['', 'Time Placed (ET)', 'Side', 'Qty']) == 'header'
+        assert classify_row(['', 'Exec Time', 'Side', 'Qty Filled']) == 'header'
+
+    def test_header_without_time_column_is_data(self):
+        assert classify_row(['', '', 'Side', 'Qty', 'Symbol']) == 'data'
+
+    def test_data_row(self):
+        cells = ['', '', '10/24/25 09:51:38', 'STOCK', 'SELL', '-100', 'TO CLOSE', 'SIDE']
+        assert classify_row(cells) == 'data'
+
+    def test_noise_and_amendment(self):
+        assert classify_row(['', ' ', '']) == 'noise'
+        assert classify_row(['', 'RE #123456', '', '3.50']) == 'amendment'
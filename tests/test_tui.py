@@ -2,31 +2,29 @@
 Tests for TUI functionality, focusing on starting_dir parameter handling.
 """
 
+import os
 import pytest
+import stat
 from pathlib import Path
-from unittest.mock import Mock, patch
 from tui import FileSelectionScreen, SchwabTUI, normalize_starting_dir
-from dataclasses import dataclass
 
 
-@dataclass
-class AppState:
-    """Mock AppState for testing."""
-    output_path: str = "output.ndjson"
+def _write_file(path):
+    """Create a small file and return its path as a string."""
+    path.write_text("test")
+    return str(path)
 
 
 class TestStartingDirParameter:
     """Tests for starting_dir parameter handling."""
 
-    def test_file_selection_screen_accepts_starting_dir(self):
+    def test_file_selection_screen_accepts_starting_dir(self, app_state):
         """FileSelectionScreen should accept starting_dir parameter."""
-        app_state = AppState()
         screen = FileSelectionScreen(app_state, starting_dir="/tmp")
         assert screen.starting_dir == "/tmp"
 
-    def test_file_selection_screen_defaults_to_current_dir(self):
+    def test_file_selection_screen_defaults_to_current_dir(self, app_state):
         """FileSelectionScreen should default to current directory."""
-        app_state = AppState()
         screen = FileSelectionScreen(app_state)
         assert screen.starting_dir == "."
 
@@ -39,8 +37,9 @@ class TestStartingDirParameter:
         """SchwabTUI should default starting_dir to current directory (normalized to absolute)."""
         tui = SchwabTUI()
         # Should be normalized to absolute path of current directory
-        assert Path(tui.starting_dir).is_absolute()
-        assert Path(tui.starting_dir).exists()
+        start = Path(tui.starting_dir)
+        assert start.is_absolute()
+        assert start.exists()
 
 
 class TestPathNormalization:
@@ -60,9 +59,9 @@ class TestPathNormalization:
         # Change to parent directory
         monkeypatch.chdir(tmp_path)
 
-        result = normalize_starting_dir("subdir")
-        assert Path(result).is_absolute()
-        assert Path(result).exists()
+        result = Path(normalize_starting_dir("subdir"))
+        assert result.is_absolute()
+        assert result.exists()
 
     def test_normalize_home_expansion(self, tmp_path, monkeypatch):
         """Tilde (~) should be expanded to user home directory."""
@@ -81,42 +80,45 @@ class TestPathNormalization:
             if test_dir.exists():
                 test_dir.rmdir()
 
-    def test_normalize_nonexistent_path_returns_current_dir(self):
-        """Non-existent paths should fall back to current directory."""
-        result = normalize_starting_dir("/this/path/does/not/exist/at/all")
-        assert result == "."
+    def test_normalize_sees_directory_created_later(self, tmp_path):
+        """A path that was missing is accepted once the directory exists."""
+        subdir = tmp_path / "later"
+        assert normalize_starting_dir(str(subdir)) == "."
 
-    def test_normalize_file_instead_of_directory_returns_current_dir(self, tmp_path):
-        """If path is a file (not directory), should fall back to current directory."""
-        test_file = tmp_path / "test.txt"
-        test_file.write_text("test")
+        subdir.mkdir()
+        assert normalize_starting_dir(str(subdir)) == str(subdir)
 
-        result = normalize_starting_dir(str(test_file))
-        assert result == "."
+    def test_normalize_relative_path_follows_cwd(self, tmp_path, monkeypatch):
+        """The same relative path resolves against the current directory."""
+        for name in ("a", "b"):
+            (tmp_path / name / "data").mkdir(parents=True)
 
-    def test_normalize_empty_string_returns_current_dir(self):
-        """Empty string should return current directory."""
-        result = normalize_starting_dir("")
-        assert result == "."
+        monkeypatch.chdir(tmp_path / "a")
+        assert normalize_starting_dir("data") == str(tmp_path / "a" / "data")
+        monkeypatch.chdir(tmp_path / "b")
+        assert normalize_starting_dir("data") == str(tmp_path / "b" / "data")
 
-    def test_normalize_none_returns_current_dir(self):
-        """None should return current directory."""
-        result = normalize_starting_dir(None)
-        assert result == "."
+    @pytest.mark.parametrize('make_input', [
+        pytest.param(lambda tmp: "/this/path/does/not/exist/at/all", id='nonexistent'),
+        pytest.param(lambda tmp: _write_file(tmp / "test.txt"), id='file-not-directory'),
+        pytest.param(lambda tmp: "", id='empty-string'),
+        pytest.param(lambda tmp: None, id='none'),
+    ])
+    def test_normalize_invalid_input_returns_current_dir(self, tmp_path, make_input):
+        """Missing paths, files, empty strings and None fall back to current directory."""
+        assert normalize_starting_dir(make_input(tmp_path)) == "."
 
 
 class TestWSLPaths:
     """Tests for WSL-specific path handling."""
 
-    def test_wsl_mnt_c_path_passthrough(self):
+    def test_wsl_mnt_c_path_passthrough(self, monkeypatch):
         """WSL /mnt/c/ paths should be passed through if they exist."""
-        with patch('pathlib.Path.exists') as mock_exists, \
-             patch('pathlib.Path.is_dir') as mock_isdir:
-            mock_exists.return_value = True
-            mock_isdir.return_value = True
+        dir_stat = os.stat_result((stat.S_IFDIR | 0o755, 0, 0, 0, 0, 0, 0, 0, 0, 0))
+        monkeypatch.setattr(os, 'stat', lambda path, **kwargs: dir_stat)
 
-            result = normalize_starting_dir("/mnt/c/Users/TestUser/Documents")
-            assert result == "/mnt/c/Users/TestUser/Documents"
+        result = normalize_starting_dir("/mnt/c/Users/TestUser/Documents")
+        assert result == "/mnt/c/Users/TestUser/Documents"
 
     def test_wsl_mnt_c_nonexistent_falls_back(self):
         """Non-existent WSL paths should fall back to current directory."""
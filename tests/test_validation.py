@@ -8,25 +8,21 @@ import tempfile
 import os
 
 
-def test_normalize_path_converts_to_absolute(tmp_path):
+def test_normalize_path_converts_to_absolute(tmp_path, monkeypatch):
     """Test that normalize_path converts relative paths to absolute."""
     from main import normalize_path
 
     # Change to tmp_path directory
-    original_cwd = os.getcwd()
-    try:
-        os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
 
-        # Create a test file
-        test_file = tmp_path / "test.csv"
-        test_file.touch()
+    # Create a test file
+    test_file = tmp_path / "test.csv"
+    test_file.touch()
 
-        # Test relative path conversion
-        result = normalize_path("test.csv")
-        assert result.is_absolute()
-        assert result == test_file
-    finally:
-        os.chdir(original_cwd)
+    # Test relative path conversion
+    result = normalize_path("test.csv")
+    assert result.is_absolute()
+    assert result == test_file
 
 
 def test_normalize_path_resolves_symlinks(tmp_path):
@@ -81,26 +77,47 @@ def test_validate_output_not_input_allows_different_file(tmp_path):
     assert error is None
 
 
-def test_validate_output_not_input_handles_relative_paths(tmp_path):
+def test_validate_output_not_input_handles_relative_paths(sample_csv_tree, monkeypatch):
     """Test that validation works with relative paths."""
     from main import validate_output_not_input
 
-    original_cwd = os.getcwd()
-    try:
-        os.chdir(tmp_path)
+    monkeypatch.chdir(sample_csv_tree)
 
-        # Create test files
-        (tmp_path / "file1.csv").touch()
-        (tmp_path / "file2.csv").touch()
+    input_paths = ["file1.csv", "./file2.csv"]
+    output_path = "file2.csv"  # Same as second input, different format
 
-        input_paths = ["file1.csv", "./file2.csv"]
-        output_path = "file2.csv"  # Same as second input, different format
+    error = validate_output_not_input(input_paths, output_path)
+
+    assert error is not None
+
+
+def test_validate_output_not_input_detects_link_to_input(tmp_path):
+    """Test that an existing output linked to an input file is a collision."""
+    from main import validate_output_not_input
 
-        error = validate_output_not_input(input_paths, output_path)
+    input_file = tmp_path / "trades.csv"
+    input_file.write_text("data")
+    hard_link = tmp_path / "hard.ndjson"
+    os.link(input_file, hard_link)
+    symlink = tmp_path / "sym.ndjson"
+    symlink.symlink_to(input_file)
 
-        assert error is not None
-    finally:
-        os.chdir(original_cwd)
+    assert validate_output_not_input([str(input_file)], str(hard_link)) is not None
+    assert validate_output_not_input([str(input_file)], str(symlink)) is not None
+
+
+def test_validate_output_not_input_allows_existing_different_file(tmp_path):
+    """Test that overwriting an unrelated existing output is not a collision."""
+    from main import validate_output_not_input
+
+    (tmp_path / "file1.csv").write_text("a")
+    (tmp_path / "output.ndjson").write_text("b")
+
+    error = validate_output_not_input(
+        [str(tmp_path / "file1.csv"), str(tmp_path / "missing.csv")], str(tmp_path / "output.ndjson")
+    )
+
+    assert error is None
 
 
 def test_validate_csv_extension_warns_for_csv_output():
@@ -122,15 +139,13 @@ def test_validate_csv_extension_allows_other_extensions():
     assert validate_csv_extension_warning("output.txt") is None
 
 
-def test_validate_input_files_exist_detects_missing(tmp_path):
+def test_validate_input_files_exist_detects_missing(sample_csv_tree):
     """Test that validate_input_files_exist detects missing files."""
     from main import validate_input_files_exist
 
-    existing = tmp_path / "exists.csv"
-    existing.touch()
-
-    missing1 = tmp_path / "missing1.csv"
-    missing2 = tmp_path / "missing2.csv"
+    existing = sample_csv_tree / "file1.csv"
+    missing1 = sample_csv_tree / "missing1.csv"
+    missing2 = sample_csv_tree / "missing2.csv"
 
     input_paths = [str(existing), str(missing1), str(missing2)]
 
@@ -141,14 +156,12 @@ def test_validate_input_files_exist_detects_missing(tmp_path):
     assert any("missing2.csv" in err for err in errors)
 
 
-def test_validate_input_files_exist_passes_when_all_exist(tmp_path):
+def test_validate_input_files_exist_passes_when_all_exist(sample_csv_tree):
     """Test that validate_input_files_exist passes when all files exist."""
     from main import validate_input_files_exist
 
-    file1 = tmp_path / "file1.csv"
-    file2 = tmp_path / "file2.csv"
-    file1.touch()
-    file2.touch()
+    file1 = sample_csv_tree / "file1.csv"
+    file2 = sample_csv_tree / "file2.csv"
 
     input_paths = [str(file1), str(file2)]
 
@@ -180,35 +193,28 @@ def test_validate_output_directory_allows_existing(tmp_path):
     assert error is None
 
 
-def test_validate_output_directory_allows_current_directory(tmp_path):
+def test_validate_output_directory_allows_current_directory(tmp_path, monkeypatch):
     """Test that validate_output_directory allows output in current directory."""
     from main import validate_output_directory
 
-    original_cwd = os.getcwd()
-    try:
-        os.chdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
 
-        error = validate_output_directory("output.ndjson")
+    error = validate_output_directory("output.ndjson")
 
-        assert error is None
-    finally:
-        os.chdir(original_cwd)
+    assert error is None
 
 
-def test_validate_file_paths_integration_all_checks(tmp_path):
+def test_validate_file_paths_integration_all_checks(sample_csv_tree):
     """Integration test for all validation checks together."""
     from main import validate_file_paths
 
-    # Create test files
-    input1 = tmp_path / "file1.csv"
-    input2 = tmp_path / "file2.csv"
-    input1.touch()
-    input2.touch()
+    input1 = sample_csv_tree / "file1.csv"
+    input2 = sample_csv_tree / "file2.csv"
 
     # Valid case - should pass
     errors = validate_file_paths(
         [str(input1), str(input2)],
-        str(tmp_path / "output.ndjson"),
+        str(sample_csv_tree / "output.ndjson"),
         force_overwrite=False
     )
     assert len(errors) == 0
@@ -223,12 +229,11 @@ def test_validate_file_paths_integration_all_checks(tmp_path):
     assert any("overwrite" in err.lower() for err in errors)
 
 
-def test_validate_file_paths_with_force_overwrite(tmp_path):
+def test_validate_file_paths_with_force_overwrite(sample_csv_tree):
     """Test that force_overwrite bypasses output collision check."""
     from main import validate_file_paths
 
-    input1 = tmp_path / "file1.csv"
-    input1.touch()
+    input1 = sample_csv_tree / "file1.csv"
 
     # With force_overwrite, output collision should be ignored
     errors = validate_file_paths(
@@ -257,16 +262,15 @@ def test_validate_file_paths_missing_input_files(tmp_path):
     assert any("not found" in err.lower() or "does not exist" in err.lower() for err in errors)
 
 
-def test_validate_file_paths_csv_extension_warning(tmp_path):
+def test_validate_file_paths_csv_extension_warning(sample_csv_tree):
     """Test that CSV extension generates a warning."""
     from main import validate_file_paths
 
-    input1 = tmp_path / "file1.csv"
-    input1.touch()
+    input1 = sample_csv_tree / "file1.csv"
 
     errors = validate_file_paths(
         [str(input1)],
-        str(tmp_path / "output.csv"),
+        str(sample_csv_tree / "output.csv"),
         force_overwrite=False
     )
 
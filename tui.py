@@ -7,6 +7,8 @@ This module provides an interactive terminal user interface for selecting
 and processing multiple Schwab CSV files.
 """
 
+import os
+import stat
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
@@ -167,15 +169,12 @@ def normalize_starting_dir(starting_dir: Optional[str]) -> str:
         return "."
 
     try:
-        # Expand user home directory (~)
-        path = Path(starting_dir).expanduser()
+        # Expand user home directory (~) and resolve to absolute path
+        path = os.path.realpath(os.path.expanduser(starting_dir))
 
-        # Resolve to absolute path (handles relative paths)
-        path = path.resolve()
-
-        # Validate: path must exist and be a directory
-        if path.exists() and path.is_dir():
-            return str(path)
+        # Validate: path must exist and be a directory (one stat call)
+        if stat.S_ISDIR(os.stat(path).st_mode):
+            return path
         else:
             # Invalid path, fall back to current directory
             return "."